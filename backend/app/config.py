@@ -9,6 +9,12 @@ class Settings(BaseSettings):
     # Database
     mongodb_uri: str = "mongodb://localhost:27017" # Can be MongoDB or PostgreSQL
     database_name: str = "ai_consular"
+    # PostgreSQL connection pool (ignored for MongoDB)
+    postgres_pool_min_size: int = 1
+    postgres_pool_max_size: int = 10
+    postgres_pool_timeout_seconds: float = 10.0  # wait for a free connection before erroring
+    postgres_insert_batch_size: int = 500  # rows per multi-row INSERT in insert_many
+    postgres_auto_migrate: bool = True  # create tables/indexes at startup (else run python -m app.migrations)
     
     @property
     def is_postgres(self) -> bool:
@@ -20,10 +26,54 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 1440
     
     # LLM Configuration
-    llm_provider: str = "gemini"  # only gemini supported now
+    llm_provider: str = "gemini"  # gemini, or fake for load tests without network access
     gemini_api_key: Optional[str] = None
-
+    llm_max_concurrency: int = 8  # max in-flight Gemini calls per worker
+    # Waiting calls allowed per priority class / per user before answering 429
+    llm_queue_depth_interactive: int = 64
+    llm_queue_depth_assist: int = 32
+    llm_queue_depth_bulk: int = 16
+    llm_queue_depth_per_user: int = 4
+    llm_call_timeout_seconds: float = 20.0  # per-call deadline before falling back
+    llm_slow_call_seconds: float = 10.0  # slower calls count as breaker failures
+    llm_breaker_failure_threshold: int = 5
+    llm_breaker_reset_seconds: float = 30.0
+    ai_cache_enabled: bool = True
+    ai_cache_max_entries: int = 512
+    ai_shared_cache_enabled: bool = True  # second tier in the ai_cache collection
+    llm_context_token_budget: int = 3000  # prompt tokens per chat call (estimated)
+    llm_max_message_tokens: int = 1000  # longer messages are truncated
+    task_summary_trigger_turns: int = 12  # summarize task conversations longer than this
+    task_summary_keep_turns: int = 4  # recent turns kept verbatim after summarizing
+    career_match_top_k: int = 8  # locally ranked domains sent to the LLM
+    motivation_pool_size: int = 32  # pre-generated motivational messages per worker
+    motivation_batch_size: int = 8
+    motivation_refresh_seconds: int = 900
+    ats_cache_ttl_seconds: int = 86400  # identical resume/PDF submissions reuse the analysis
+    ats_cache_max_entries: int = 256
+    fallback_intents_path: Optional[str] = None  # JSON list of intents extending the built-in table
     
+    # Background AI jobs
+    job_workers: int = 2
+    job_max_attempts: int = 3
+    job_idempotency_window_seconds: int = 3600  # resubmits within this window reuse the job
+    job_stale_seconds: int = 600  # running jobs older than this are re-queued on startup
+
+    # Fake provider (LLM_PROVIDER=fake)
+    fake_llm_latency_ms: float = 800.0  # median response latency
+    fake_llm_latency_sigma: float = 0.5  # log-normal spread of the latency
+    fake_llm_tokens_per_second: float = 60.0  # streaming rate
+    fake_llm_failure_rate: float = 0.0
+    fake_llm_block_rate: float = 0.0  # fraction of safety-blocked responses
+    fake_llm_seed: Optional[int] = None
+
+    # Record/replay of LLM calls: off, record or replay
+    llm_cassette_mode: str = "off"
+    llm_cassette_path: str = "cassettes/llm_calls.jsonl.gz"
+    llm_cassette_simulate_latency: bool = False  # replay with the recorded latencies
+    llm_cassette_substitute: bool = False  # replay unmatched prompts with the next unused recording
+
+
     # Environment
     environment: str = "development"
     frontend_url: str = "http://localhost:5173"
@@ -0,0 +1,80 @@
+"""
+Intent table for offline mentor fallback responses
+Keywords match whole words; a trailing * matches any word starting with the keyword.
+Intents are listed in priority order (earlier wins a tie); "default" has no keywords.
+"""
+
+FALLBACK_INTENTS = [
+    {
+        "intent": "academic",
+        "keywords": ["study*", "learn*", "understand*", "subject*", "exam*", "test", "tests", "assignment*", "homework"],
+        "responses": [
+            "Great question! When studying, I recommend the Feynman Technique: try explaining the concept in simple words as if teaching someone else. This helps identify gaps in your understanding. Also, break your study sessions into 25-minute focused blocks with 5-minute breaks (Pomodoro Technique). Would you like specific tips for any particular subject?",
+            "Studying effectively is all about active recall and spaced repetition. Instead of just re-reading notes, try testing yourself frequently. Create flashcards, solve practice problems, and explain concepts aloud. Also, don't cram - spread your study sessions over days or weeks. What subject are you working on?",
+            "Focus on understanding concepts rather than memorizing. Use multiple resources - videos, articles, practice problems. Study in a distraction-free environment, and teach what you learn to others. This reinforces your own understanding. Need help with a specific topic?"
+        ]
+    },
+    {
+        "intent": "motivation",
+        "keywords": ["motivat*", "inspir*", "give up", "fail*", "difficult*", "hard", "cant", "can't", "stress*", "overwhelm*"],
+        "responses": [
+            "I understand it feels overwhelming right now, but remember - every expert was once a beginner. Your struggles today are building the skills you'll use tomorrow. Break your goals into smaller, achievable tasks. Celebrate small wins. You're capable of more than you think! 💪",
+            "Tough times don't last, but tough students do! It's okay to feel challenged - that's how we grow. Remember why you started this journey. Take breaks when needed, but don't give up. Every great engineer faced difficulties. What matters is persistence. You've got this!",
+            "Feeling stuck is part of the learning process. Instead of saying 'I can't do this,' try 'I can't do this YET.' Every mistake is a lesson. Take a deep breath, break the problem into smaller parts, and tackle one piece at a time. Progress, not perfection!"
+        ]
+    },
+    {
+        "intent": "career",
+        "keywords": ["career*", "job*", "future", "work*", "placement*", "interview*", "compan*", "salary", "salaries"],
+        "responses": [
+            "Great that you're thinking ahead! Focus on building strong fundamentals in your branch subjects first. Then, identify your interests and work on relevant projects. Contribute to open source, build a portfolio, and network with professionals. Internships are crucial - they give real-world experience. What field interests you most?",
+            "Career success comes from continuous learning and practical experience. Start by identifying your strengths and interests. Work on projects that showcase your skills. Learn in-demand technologies. Practice coding/problem-solving regularly. Attend hackathons and workshops. Remember, your first job is just the beginning of a long journey!",
+            "Planning your career is smart! Build technical skills through projects, contribute to GitHub, create a strong LinkedIn profile. Practice for technical interviews regularly. Soft skills matter too - communication, teamwork, problem-solving. Consider what type of work excites you and align your learning accordingly."
+        ]
+    },
+    {
+        "intent": "productivity",
+        "keywords": ["productiv*", "time", "manag*", "focus*", "concentrat*", "procrastinat*", "distract*"],
+        "responses": [
+            "Great question! Try the Pomodoro Technique: work in focused 25-minute sessions with 5-minute breaks. Use apps to block distracting websites during study time. Create a dedicated study space. Plan your day the night before. Prioritize tasks using the Eisenhower Matrix (urgent vs important). Most importantly, be consistent!",
+            "Productivity tips that work: 1) Start with your hardest task (eat the frog). 2) Use time-blocking - assign specific hours to specific tasks. 3) Minimize multitasking. 4) Keep your phone away during study. 5) Take regular breaks. 6) Get enough sleep - tired minds aren't productive!",
+            "Managing time effectively is a skill you can develop. Create a weekly schedule with dedicated study blocks. Use the 2-minute rule - if something takes less than 2 minutes, do it now. Batch similar tasks together. Track how you spend time for a week to identify time-wasters. Remember: discipline beats motivation!"
+        ]
+    },
+    {
+        "intent": "skills",
+        "keywords": ["skill*", "course*", "tutorial*", "practic*", "improv*", "better"],
+        "responses": [
+            "Building skills requires consistent practice! Focus on project-based learning - it's more effective than just watching tutorials. Start with fundamentals, then build real projects. Use platforms like GitHub to showcase your work. Learn by teaching others. Set specific, measurable goals. What skill are you working on?",
+            "Great that you want to improve! Here's my advice: 1) Learn by doing - build projects, not just tutorials. 2) Join coding communities. 3) Read documentation and source code. 4) Practice daily, even if just 30 minutes. 5) Get feedback on your work. 6) Don't try to learn everything - go deep in a few areas first.",
+            "Skill development is a journey! Start with free resources like NPTEL, Coursera, and YouTube. But don't just consume - create! Build projects that solve real problems. Contribute to open source. Participate in hackathons. Learn from failures. The best learning happens when you're building something challenging."
+        ]
+    },
+    {
+        "intent": "greeting",
+        "keywords": ["hi", "hello", "hey", "greetings"],
+        "responses": [
+            "Hello! I'm here to help you with your academic journey, career planning, motivation, or any challenges you're facing. What's on your mind today?",
+            "Hey there! Great to see you! Whether you need study tips, career advice, motivation, or just someone to talk to, I'm here. How can I support you today?",
+            "Hi! Welcome! I'm your AI mentor, ready to help with academics, career guidance, productivity tips, or anything else you need. What would you like to discuss?"
+        ]
+    },
+    {
+        "intent": "thanks",
+        "keywords": ["thank*", "appreciat*"],
+        "responses": [
+            "You're very welcome! I'm always here to help. Keep up the great work, and don't hesitate to reach out anytime you need guidance or support!",
+            "Happy to help! Remember, asking questions and seeking guidance is a sign of strength, not weakness. Keep pushing forward - you're doing great!",
+            "My pleasure! Your success is what matters. Keep learning, keep growing, and keep believing in yourself. I'm here whenever you need me!"
+        ]
+    },
+    {
+        "intent": "default",
+        "keywords": [],
+        "responses": [
+            "That's an interesting question! As a B-Tech student, remember that challenges are opportunities to grow. Whether it's about academics, career planning, or personal development, I'm here to guide you. Could you tell me more about what you're working on or struggling with?",
+            "I'm here to support you! Whether you need help with studying, career planning, managing stress, or improving productivity, feel free to ask. What specific aspect would you like to discuss?",
+            "Thanks for sharing! My goal is to help you succeed in your engineering journey. I can assist with academic guidance, career advice, motivation, study strategies, and more. What would be most helpful for you right now?"
+        ]
+    }
+]
@@ -12,9 +12,18 @@ def connect_db():
     try:
         if settings.is_postgres:
             from .postgres_adapter import PostgresClient
-            client = PostgresClient(settings.mongodb_uri)
+            client = PostgresClient(
+                settings.mongodb_uri,
+                min_size=settings.postgres_pool_min_size,
+                max_size=settings.postgres_pool_max_size,
+                timeout=settings.postgres_pool_timeout_seconds,
+                insert_batch_size=settings.postgres_insert_batch_size
+            )
             database = client[settings.database_name]
             print(f"[OK] Connected to PostgreSQL: {settings.database_name}")
+            if settings.postgres_auto_migrate:
+                from .migrations import migrate
+                migrate(database)
         else:
             from pymongo import MongoClient
             client = MongoClient(
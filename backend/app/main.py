@@ -1,9 +1,13 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from .database import connect_db, close_db
 from .config import settings
-from .routes import auth, tasks, career, resume, mentor, internships, stats, courses, gate
+from .routes import auth, tasks, career, resume, mentor, internships, stats, courses, gate, jobs
+from .services.concurrency import LLMQueueFullError
+from .services.job_queue import job_queue
+from .services.ai_service import ai_service
 
 
 @asynccontextmanager
@@ -41,9 +45,15 @@ async def lifespan(app: FastAPI):
             print("       Student: student1@example.com / password123")
         except Exception as e:
             print(f"[ERROR] Failed to seed demo data: {e}")
+    
+    job_queue.start()
+    print(f"[INFO] AI job workers started ({job_queue.workers})")
+    ai_service.motivation_pool.start()
             
     yield
     # Shutdown
+    await job_queue.stop()
+    await ai_service.motivation_pool.stop()
     close_db()
 
 
@@ -71,6 +81,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(LLMQueueFullError)
+async def llm_queue_full_handler(request: Request, exc: LLMQueueFullError):
+    """Shed load early when the AI queues are full"""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "AI assistant is busy right now. Please try again shortly."},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(tasks.router)
@@ -81,6 +101,7 @@ app.include_router(internships.router)
 app.include_router(stats.router)
 app.include_router(courses.router)
 app.include_router(gate.router)
+app.include_router(jobs.router)
 from .routes import quiz
 app.include_router(quiz.router)
 
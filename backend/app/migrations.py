@@ -0,0 +1,51 @@
+"""
+PostgreSQL schema migration for AI Consular
+
+Creates the JSONB table and field indexes of every collection in one transaction.
+Runs at startup unless POSTGRES_AUTO_MIGRATE=false; to run it explicitly (e.g. before a deploy):
+python -m app.migrations
+"""
+
+import sys
+from app.config import settings
+from app.database import connect_db, get_database
+
+# Collection -> document fields used in equality filters on hot paths
+SCHEMA = {
+    "users": ["email"],
+    "tasks": ["student_id"],
+    "activities": ["student_id"],
+    "courses": [],
+    "internships": ["student_id"],
+    "resumes": ["student_id"],
+    "career_domains": [],
+    "gate_questions": [],
+    "gate_progress": ["user_id"],
+    "jobs": ["student_id", "status"],
+    "ai_cache": []
+}
+
+
+def migrate(database=None) -> bool:
+    """Apply SCHEMA to a PostgreSQL database; MongoDB creates collections on demand"""
+    database = database if database is not None else get_database()
+    if database is None or not hasattr(database, "migrate"):
+        return False
+    database.migrate(SCHEMA)
+    print(f"[OK] PostgreSQL schema ready ({len(SCHEMA)} collections)")
+    return True
+
+
+def main():
+    if not settings.is_postgres:
+        print("[INFO] MONGODB_URI is not a PostgreSQL URI; nothing to migrate.")
+        return
+    settings.postgres_auto_migrate = False
+    connect_db()
+    if not migrate():
+        print("[ERROR] Could not connect to PostgreSQL.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
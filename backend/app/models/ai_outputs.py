@@ -0,0 +1,55 @@
+from pydantic import BaseModel
+from typing import List
+
+# Response schemas for Gemini JSON mode. Gemini's schema format rejects keys such
+# as `examples`, so these stay plain; API-facing models live in the other modules.
+
+
+class CareerPathPhase(BaseModel):
+    phase: str
+    duration: str
+    focus: str
+
+
+class CareerPath(BaseModel):
+    domain: str
+    match_score: int
+    reasoning: str
+    required_skills: List[str] = []
+    roadmap_phases: List[CareerPathPhase] = []
+
+
+class CareerPathsOutput(BaseModel):
+    paths: List[CareerPath]
+
+
+class CareerMatch(BaseModel):
+    domain_id: str
+    domain_title: str
+    match_score: int
+    reasoning: str
+    next_step: str
+
+
+class CareerMatchesOutput(BaseModel):
+    matches: List[CareerMatch]
+
+
+class ATSSuggestionsOutput(BaseModel):
+    suggestions: List[str] = []
+
+
+class RoadmapMonth(BaseModel):
+    month: int
+    focus: str
+    topics: List[str] = []
+    resources: List[str] = []
+    milestones: List[str] = []
+
+
+class SkillRoadmapOutput(BaseModel):
+    months: List[RoadmapMonth]
+
+
+class MotivationBatchOutput(BaseModel):
+    messages: List[str]
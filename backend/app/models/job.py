@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Any
+from datetime import datetime
+
+
+class RoadmapJobRequest(BaseModel):
+    """Skill roadmap generation job"""
+    domain_id: str = Field(..., examples=["full_stack_developer"])
+    timeline_months: int = Field(12, ge=1, le=24, examples=[6])
+
+
+class InterviewPrepJobRequest(BaseModel):
+    """Interview preparation job"""
+    domain_id: str = Field(..., examples=["full_stack_developer"])
+    experience_level: str = Field("fresher", examples=["fresher"])
+
+
+class JobStatusResponse(BaseModel):
+    """Status of a background AI job"""
+    job_id: str = Field(..., examples=["3f9c2a7b1e4d5c6a7b8c9d0e"])
+    type: str = Field(..., examples=["skill_roadmap"])
+    status: str = Field(..., examples=["queued"])  # queued, running, succeeded, failed
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class JobResultResponse(JobStatusResponse):
+    """Finished job with its result"""
+    result: Any = Field(None, examples=[{"roadmap": "Month 1: ..."}])
@@ -1,9 +1,32 @@
 import psycopg2
-from psycopg2.extras import Json
+from psycopg2.extras import Json, execute_values
 import json
-from datetime import datetime
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 import uuid
 from typing import Any, Dict, List, Optional, Union
+from .services.ai_metrics import registry, Histogram, Gauge
+from .postgres_aggregate import compile_pipeline, split_leading_match, run_pipeline
+
+# Seconds spent waiting for a pooled connection
+POOL_WAIT = registry.register(Histogram(
+    "db_pool_wait_seconds", "Time spent waiting to check out a Postgres connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+))
+_pools: List["ConnectionPool"] = []
+registry.register(Gauge(
+    "db_pool_connections", "Postgres pool connections by state", ("state",),
+    lambda: [((state,), sum(p.stats()[state] for p in _pools)) for state in ("in_use", "idle")]
+))
+
+UPDATE_OPERATORS = {"$set", "$inc", "$push", "$addToSet", "$pull", "$unset"}
+
+class UpdateResult:
+    def __init__(self, matched_count: int, modified_count: int):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
 
 class PostgresCursor:
     def __init__(self, collection, query, params):
@@ -30,7 +53,7 @@ class PostgresCursor:
         if self._limit:
             query += f" LIMIT {self._limit}"
         
-        with self.collection.db.conn.cursor() as cur:
+        with self.collection.db.pool.connection() as conn, conn.cursor() as cur:
             cur.execute(query, self.params)
             rows = cur.fetchall()
             docs = []
@@ -51,13 +74,78 @@ class PostgresCollection:
     def __init__(self, db, name: str):
         self.db = db
         self.name = name
-        self._ensure_table()
 
     def _ensure_table(self):
-        with self.db.conn.cursor() as cur:
-            cur.execute(f"CREATE TABLE IF NOT EXISTS {self.name} (id TEXT PRIMARY KEY, doc JSONB)")
-            cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.name}_doc ON {self.name} USING GIN (doc)")
-        self.db.conn.commit()
+        with self.db.pool.connection() as conn, conn.cursor() as cur:
+            for statement in _table_ddl(self.name):
+                cur.execute(statement)
+
+    def create_index(self, keys, expireAfterSeconds: Optional[int] = None, **kwargs):
+        """Create an index on a document field.
+
+        With expireAfterSeconds this emulates a MongoDB TTL index: rows get an
+        indexed expires_at column derived from the field and expired rows are purged.
+        """
+        field = keys if isinstance(keys, str) else keys[0][0]
+        with self.db.pool.connection() as conn, conn.cursor() as cur:
+            if expireAfterSeconds is None:
+                cur.execute(_field_index_ddl(self.name, field))
+            else:
+                cur.execute(f"ALTER TABLE {self.name} ADD COLUMN IF NOT EXISTS expires_at TIMESTAMPTZ")
+                cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.name}_expires_at ON {self.name} (expires_at)")
+        
+        if expireAfterSeconds is not None:
+            self.db.ttl_fields[self.name] = (field, expireAfterSeconds)
+            self._purge_expired(force=True)
+        return f"{field}_1"
+
+    def _expires_at(self, doc: Dict[str, Any]):
+        """Expiry timestamp for a document in a TTL collection, or None"""
+        ttl = self.db.ttl_fields.get(self.name)
+        if not ttl:
+            return None
+        field, seconds = ttl
+        value = doc.get(field)
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                return None
+        if not isinstance(value, datetime):
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value + timedelta(seconds=seconds)
+
+    def _purge_expired(self, force: bool = False):
+        """Delete expired rows, at most once a minute like MongoDB's TTL monitor"""
+        if self.name not in self.db.ttl_fields:
+            return
+        now = time.monotonic()
+        if not force and now - self.db.ttl_purged_at.get(self.name, 0) < 60:
+            return
+        self.db.ttl_purged_at[self.name] = now
+        with self.db.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(f"DELETE FROM {self.name} WHERE expires_at <= NOW()")
+
+    def _upsert_sql(self, doc: Dict[str, Any]):
+        """INSERT ... ON CONFLICT statement and params for one serialized document"""
+        row = self._upsert_row(doc)
+        return self._upsert_statement("(" + ", ".join(["%s"] * len(row)) + ")"), row
+
+    def _upsert_statement(self, values: str = "%s") -> str:
+        """INSERT ... ON CONFLICT statement; the default VALUES %s is the execute_values template"""
+        if self.name in self.db.ttl_fields:
+            return (
+                f"INSERT INTO {self.name} (id, doc, expires_at) VALUES {values} "
+                f"ON CONFLICT (id) DO UPDATE SET doc = EXCLUDED.doc, expires_at = EXCLUDED.expires_at"
+            )
+        return f"INSERT INTO {self.name} (id, doc) VALUES {values} ON CONFLICT (id) DO UPDATE SET doc = EXCLUDED.doc"
+
+    def _upsert_row(self, doc: Dict[str, Any]) -> tuple:
+        if self.name in self.db.ttl_fields:
+            return doc["_id"], self._json_serialize(doc), self._expires_at(doc)
+        return doc["_id"], self._json_serialize(doc)
 
     def _json_serialize(self, doc):
         def default(o):
@@ -76,38 +164,38 @@ class PostgresCollection:
             doc["_id"] = str(doc["_id"])
         
         doc_id = doc["_id"]
-        json_doc = self._json_serialize(doc)
         
-        with self.db.conn.cursor() as cur:
-            cur.execute(
-                f"INSERT INTO {self.name} (id, doc) VALUES (%s, %s) ON CONFLICT (id) DO UPDATE SET doc = EXCLUDED.doc",
-                (doc_id, json_doc)
-            )
-        self.db.conn.commit()
+        with self.db.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(*self._upsert_sql(doc))
+        self._purge_expired()
         
         class InsertResult:
             def __init__(self, inserted_id):
                 self.inserted_id = inserted_id
         return InsertResult(doc_id)
 
-    def insert_many(self, docs: List[Dict[str, Any]]):
+    def insert_many(self, docs: List[Dict[str, Any]], batch_size: Optional[int] = None):
+        """Upsert documents with multi-row INSERT statements of batch_size rows each"""
         ids = []
-        with self.db.conn.cursor() as cur:
-            for doc in docs:
-                if "_id" not in doc:
-                    import secrets
-                    doc["_id"] = secrets.token_hex(12)
-                else:
-                    doc["_id"] = str(doc["_id"])
-                
-                doc_id = doc["_id"]
-                ids.append(doc_id)
-                json_doc = self._json_serialize(doc)
-                cur.execute(
-                    f"INSERT INTO {self.name} (id, doc) VALUES (%s, %s) ON CONFLICT (id) DO UPDATE SET doc = EXCLUDED.doc",
-                    (doc_id, json_doc)
-                )
-        self.db.conn.commit()
+        rows: Dict[str, tuple] = {}
+        for doc in docs:
+            if "_id" not in doc:
+                import secrets
+                doc["_id"] = secrets.token_hex(12)
+            else:
+                doc["_id"] = str(doc["_id"])
+            
+            doc_id = doc["_id"]
+            ids.append(doc_id)
+            # A statement may not upsert the same id twice; the last document wins as with one-by-one upserts
+            rows.pop(doc_id, None)
+            rows[doc_id] = self._upsert_row(doc)
+        
+        if rows:
+            page_size = max(1, batch_size or self.db.insert_batch_size)
+            with self.db.pool.connection() as conn, conn.cursor() as cur:
+                execute_values(cur, self._upsert_statement(), list(rows.values()), page_size=page_size)
+        self._purge_expired()
         
         class InsertManyResult:
             def __init__(self, inserted_ids):
@@ -160,7 +248,10 @@ class PostgresCollection:
                     field_ref += f"->'{p}'"
                 field_ref += f"->>'{parts[-1]}'"
 
-            if isinstance(v, dict):
+            if v is None:
+                # Like MongoDB, {field: None} matches a missing field as well as null
+                conditions.append(f"{field_ref} IS NULL")
+            elif isinstance(v, dict):
                 if "$ne" in v:
                     conditions.append(f"{field_ref} != %s")
                     params.append(str(v["$ne"]))
@@ -178,97 +269,162 @@ class PostgresCollection:
         return " AND ".join(conditions), params
 
     def aggregate(self, pipeline: List[Dict[str, Any]]):
-        """Very basic $group emulation for stats"""
-        # For this prototype, we'll fetch then process in Python if it's a small dataset
-        # In a real app, this would translate to SQL GROUP BY
-        docs = list(self.find({}))
+        """Run an aggregation pipeline as one SQL statement when it translates (see postgres_aggregate).
+
+        Other pipelines stream the rows selected by their leading $match stages and
+        evaluate the remaining stages in Python.
+        """
+        compiled = compile_pipeline(self, pipeline)
+        if compiled is not None:
+            with self.db.pool.connection() as conn, conn.cursor() as cur:
+                cur.execute(*compiled)
+                return [_load_doc(row[0]) for row in cur.fetchall()]
         
-        for stage in pipeline:
-            if "$group" in stage:
-                group_config = stage["$group"]
-                id_field = group_config["_id"]
-                if isinstance(id_field, str) and id_field.startswith("$"):
-                    id_key = id_field[1:]
-                else:
-                    id_key = id_field
-                
-                results = {}
-                for doc in docs:
-                    val = doc.get(id_key, "Unknown")
-                    if val not in results:
-                        results[val] = {"_id": val}
-                        for k in group_config:
-                            if k == "_id": continue
-                            results[val][k] = 0
-                    
-                    # Handle simple $sum: 1 or $sum: {$cond: ...}
-                    for k, op in group_config.items():
-                        if k == "_id": continue
-                        if "$sum" in op:
-                            summ = op["$sum"]
-                            if summ == 1:
-                                results[val][k] += 1
-                            elif isinstance(summ, dict) and "$cond" in summ:
-                                # Very basic $cond emulation
-                                cond = summ["$cond"]
-                                if isinstance(cond, list) and len(cond) == 3:
-                                    # [{$eq: ["$status", "completed"]}, 1, 0]
-                                    eq = cond[0].get("$eq")
-                                    if eq:
-                                        f_key = eq[0][1:] if eq[0].startswith("$") else eq[0]
-                                        if doc.get(f_key) == eq[1]:
-                                            results[val][k] += cond[1]
-                                        else:
-                                            results[val][k] += cond[2]
-                return list(results.values())
-        return docs
+        where, params, stages = split_leading_match(self, pipeline)
+        query = f"SELECT doc FROM {self.name}" + (f" WHERE {where}" if where else "")
+        with self.db.pool.connection() as conn, conn.cursor(name=f"aggregate_{self.name}") as cur:
+            cur.itersize = 1000  # rows fetched per round trip
+            cur.execute(query, params)
+            return run_pipeline((_load_doc(row[0]) for row in cur), stages)
 
-    def update_one(self, filter: Dict[str, Any], update: Dict[str, Any]):
-        doc = self.find_one(filter)
-        if not doc:
-            return None
+    def _compile_update(self, update: Dict[str, Any]):
+        """SQL expression computing the updated doc from the current one, and its params.
+
+        Each field operation wraps the expression in jsonb_set (or #- for $unset),
+        reading the field's current value from the row being updated, so the
+        whole update is applied atomically by a single UPDATE statement.
+        """
+        expr, params = "doc", []
+        fields = []
+        for op, spec in update.items():
+            if op not in UPDATE_OPERATORS:
+                raise ValueError(f"Unsupported update operator {op}")
+            for key, value in spec.items():
+                if not key or key.startswith("$") or key == "_id":
+                    raise ValueError(f"Cannot update field {key!r}")
+                fields.append((op, key.split("."), value))
+
+        # Dotted paths need their parent objects to exist before jsonb_set can write into them
+        parents = {tuple(path[:i]) for op, path, _ in fields if op not in ("$unset", "$pull") for i in range(1, len(path))}
+        for parent in sorted(parents, key=len):
+            parent = list(parent)
+            expr = (
+                f"jsonb_set({expr}, %s::text[], COALESCE(CASE WHEN jsonb_typeof(doc #> %s::text[]) = 'object' "
+                f"THEN doc #> %s::text[] END, '{{}}'::jsonb))"
+            )
+            params += [parent, parent, parent]
+
+        array = "COALESCE(CASE WHEN jsonb_typeof(doc #> %s::text[]) = 'array' THEN doc #> %s::text[] END, '[]'::jsonb)"
+        for op, path, value in fields:
+            if op == "$set":
+                expr = f"jsonb_set({expr}, %s::text[], %s::jsonb)"
+                params += [path, self._json_serialize(value)]
+            elif op == "$inc":
+                expr = (
+                    f"jsonb_set({expr}, %s::text[], to_jsonb(COALESCE(CASE WHEN jsonb_typeof(doc #> %s::text[]) = 'number' "
+                    f"THEN (doc #>> %s::text[])::numeric END, 0) + %s::numeric))"
+                )
+                params += [path, path, path, value]
+            elif op == "$unset":
+                expr = f"({expr}) #- %s::text[]"
+                params.append(path)
+            elif op == "$pull":  # drop elements equal to the value or to any of {"$in": [...]}; no-op if missing
+                items = value["$in"] if isinstance(value, dict) and "$in" in value else [value]
+                expr = (
+                    f"jsonb_set({expr}, %s::text[], COALESCE((SELECT jsonb_agg(a.e ORDER BY a.o) "
+                    f"FROM jsonb_array_elements({array}) WITH ORDINALITY AS a(e, o) "
+                    f"WHERE NOT EXISTS (SELECT 1 FROM jsonb_array_elements(%s::jsonb) AS x(e) WHERE x.e = a.e)), "
+                    f"'[]'::jsonb), false)"
+                )
+                params += [path, path, path, self._json_serialize(items)]
+            else:
+                items = value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+                if op == "$push":
+                    expr = f"jsonb_set({expr}, %s::text[], {array} || %s::jsonb)"
+                    params += [path, path, path, self._json_serialize(items)]
+                else:  # $addToSet: append items not already in the array
+                    unique = []
+                    for item in items:
+                        if item not in unique:
+                            unique.append(item)
+                    expr = (
+                        f"jsonb_set({expr}, %s::text[], {array} || COALESCE((SELECT jsonb_agg(x.e ORDER BY x.o) "
+                        f"FROM jsonb_array_elements(%s::jsonb) WITH ORDINALITY AS x(e, o) "
+                        f"WHERE NOT EXISTS (SELECT 1 FROM jsonb_array_elements({array}) AS a(e) WHERE a.e = x.e)), "
+                        f"'[]'::jsonb))"
+                    )
+                    params += [path, path, path, self._json_serialize(unique), path, path]
+        return expr, params
+
+    def _update(self, filter: Dict[str, Any], update: Dict[str, Any], limit: Optional[int] = None):
+        """Apply update operators to matching rows in one UPDATE; returns (matched, modified)"""
+        expr, set_params = self._compile_update(update)
+        where, where_params = self._build_where(filter) if filter else ("", [])
         
-        modified = False
-        if "$set" in update:
-            doc.update(update["$set"])
-            modified = True
-        if "$inc" in update:
-            for k, v in update["$inc"].items():
-                doc[k] = doc.get(k, 0) + v
-            modified = True
-        if "$push" in update:
-            for k, v in update["$push"].items():
-                if k not in doc or not isinstance(doc[k], list):
-                    doc[k] = []
-                doc[k].append(v)
-            modified = True
-        if "$addToSet" in update:
-            for k, v in update["$addToSet"].items():
-                if k not in doc or not isinstance(doc[k], list):
-                    doc[k] = []
-                if isinstance(v, dict) and "$each" in v:
-                    for item in v["$each"]:
-                        if item not in doc[k]:
-                            doc[k].append(item)
-                else:
-                    if v not in doc[k]:
-                        doc[k].append(v)
-            modified = True
+        # Stamp updated_at only when the document actually changes, unless the update sets it
+        if "updated_at" not in update.get("$set", {}):
+            expr = f"(SELECT CASE WHEN n.v = {self.name}.doc THEN n.v ELSE n.v || %s::jsonb END FROM (SELECT {expr} AS v) n)"
+            set_params.insert(0, json.dumps({"updated_at": datetime.now(timezone.utc).isoformat()}))
+        assignments = f"doc = {expr}"
+        ttl = self.db.ttl_fields.get(self.name)
+        if ttl and ttl[0] in update.get("$set", {}):
+            assignments += ", expires_at = %s"
+            set_params.append(self._expires_at({ttl[0]: update["$set"][ttl[0]]}))
         
-        if modified:
-            doc["updated_at"] = datetime.now().isoformat()
-            json_doc = self._json_serialize(doc)
-            with self.db.conn.cursor() as cur:
-                cur.execute(
-                    f"UPDATE {self.name} SET doc = %s WHERE id = %s",
-                    (json_doc, doc["_id"])
-                )
-            self.db.conn.commit()
-            
+        # Rows are locked in the CTE; concurrent updates of the same row queue up and each
+        # sees the previous one's result, so increments and claims are never lost
+        sql = (
+            f"WITH target AS (SELECT id, doc AS old FROM {self.name}"
+            f"{' WHERE ' + where if where else ''}{f' LIMIT {int(limit)}' if limit else ''} FOR UPDATE) "
+            f"UPDATE {self.name} SET {assignments} FROM target WHERE {self.name}.id = target.id "
+            f"RETURNING {self.name}.doc IS DISTINCT FROM target.old"
+        )
+        with self.db.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(sql, where_params + set_params)
+            flags = [row[0] for row in cur.fetchall()]
+        return len(flags), sum(1 for changed in flags if changed)
+
+    def update_one(self, filter: Dict[str, Any], update: Dict[str, Any]):
+        return UpdateResult(*self._update(filter, update, limit=1))
+
+    def update_many(self, filter: Dict[str, Any], update: Dict[str, Any]):
+        return UpdateResult(*self._update(filter, update))
+
+    def replace_one(self, filter: Dict[str, Any], replacement: Dict[str, Any], upsert: bool = False):
         class UpdateResult:
-            def __init__(self, modified_count):
+            def __init__(self, modified_count, upserted_id=None):
                 self.modified_count = modified_count
-        return UpdateResult(1 if modified else 0)
+                self.upserted_id = upserted_id
+
+        if set(filter) == {"_id"} and not isinstance(filter["_id"], dict):
+            return self._replace_by_id(str(filter["_id"]), replacement, upsert, UpdateResult)
+        
+        existing = self.find_one(filter)
+        if existing:
+            replacement["_id"] = existing["_id"]
+            self.insert_one(replacement)
+            return UpdateResult(1)
+        if not upsert:
+            return UpdateResult(0)
+        if "_id" in filter and "_id" not in replacement:
+            replacement["_id"] = filter["_id"]
+        return UpdateResult(0, self.insert_one(replacement).inserted_id)
+
+    def _replace_by_id(self, doc_id: str, replacement: Dict[str, Any], upsert: bool, result_type):
+        """Replace (or upsert) one document by _id in a single statement"""
+        doc = {**replacement, "_id": doc_id}
+        row = self._upsert_row(doc)
+        with self.db.pool.connection() as conn, conn.cursor() as cur:
+            if upsert:
+                # xmax is 0 only for a freshly inserted row
+                cur.execute(self._upsert_sql(doc)[0] + " RETURNING xmax = 0", row)
+                result = result_type(0, doc_id) if cur.fetchone()[0] else result_type(1)
+            else:
+                columns = "doc = %s, expires_at = %s" if len(row) == 3 else "doc = %s"
+                cur.execute(f"UPDATE {self.name} SET {columns} WHERE id = %s", row[1:] + (doc_id,))
+                result = result_type(cur.rowcount)
+        self._purge_expired()
+        return result
 
     def count_documents(self, filter: Dict[str, Any]):
         query = f"SELECT COUNT(*) FROM {self.name}"
@@ -280,7 +436,7 @@ class PostgresCollection:
                 query += " WHERE " + conditions
                 params.extend(filter_params)
 
-        with self.db.conn.cursor() as cur:
+        with self.db.pool.connection() as conn, conn.cursor() as cur:
             cur.execute(query, params)
             return cur.fetchone()[0]
 
@@ -300,45 +456,248 @@ class PostgresCollection:
                     params.extend([k, str(v)])
             query = f"DELETE FROM {self.name} WHERE " + " AND ".join(conditions)
             
-        with self.db.conn.cursor() as cur:
+        with self.db.pool.connection() as conn, conn.cursor() as cur:
             cur.execute(query, params)
-        self.db.conn.commit()
 
     def delete_one(self, filter: Dict[str, Any]):
         doc = self.find_one(filter)
         if doc:
-            with self.db.conn.cursor() as cur:
+            with self.db.pool.connection() as conn, conn.cursor() as cur:
                 cur.execute(f"DELETE FROM {self.name} WHERE id = %s", (doc["_id"],))
-            self.db.conn.commit()
             class DeleteResult:
                 def __init__(self, count):
                     self.deleted_count = count
             return DeleteResult(1)
         return DeleteResult(0)
 
+def _load_doc(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+def _table_ddl(name: str) -> List[str]:
+    return [
+        f"CREATE TABLE IF NOT EXISTS {name} (id TEXT PRIMARY KEY, doc JSONB)",
+        f"CREATE INDEX IF NOT EXISTS idx_{name}_doc ON {name} USING GIN (doc)"
+    ]
+
+def _field_index_ddl(name: str, field: str) -> str:
+    return f"CREATE INDEX IF NOT EXISTS idx_{name}_{field} ON {name} ((doc->>'{field}'))"
+
 class PostgresDatabase:
-    def __init__(self, conn):
-        self.conn = conn
+    def __init__(self, pool: "ConnectionPool", insert_batch_size: int = 500):
+        self.pool = pool
+        self.insert_batch_size = insert_batch_size
+        # TTL index emulation: collection name -> (field, expireAfterSeconds)
+        self.ttl_fields: Dict[str, tuple] = {}
+        self.ttl_purged_at: Dict[str, float] = {}
+        # One collection object per table for the whole process; its DDL runs only when first created
+        self._collections: Dict[str, PostgresCollection] = {}
+        self._lock = threading.Lock()
 
     def __getitem__(self, name: str):
-        return PostgresCollection(self, name)
+        collection = self._collections.get(name)
+        if collection is None:
+            with self._lock:
+                collection = self._collections.get(name)
+                if collection is None:
+                    collection = PostgresCollection(self, name)
+                    collection._ensure_table()
+                    self._collections[name] = collection
+        return collection
+
+    def migrate(self, schema: Dict[str, List[str]]):
+        """Create tables and field indexes in one transaction (collection name -> indexed fields)"""
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            for name, fields in schema.items():
+                for statement in _table_ddl(name):
+                    cur.execute(statement)
+                for field in fields:
+                    cur.execute(_field_index_ddl(name, field))
+        with self._lock:
+            for name in schema:
+                self._collections.setdefault(name, PostgresCollection(self, name))
+
+class PoolTimeoutError(psycopg2.OperationalError):
+    """No pooled connection became free within the checkout timeout"""
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool.
+
+    Each operation checks out its own connection and returns it afterwards. The
+    transaction is committed on success and rolled back on error, so a failed
+    statement never poisons another request's connection. Closed connections,
+    and idle ones that fail a health check, are replaced transparently.
+    """
+
+    def __init__(self, uri: str, min_size: int = 1, max_size: int = 10,
+                 timeout: float = 10.0, health_check_seconds: float = 30.0):
+        self.uri = uri
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.timeout = timeout
+        self.health_check_seconds = health_check_seconds
+        self._idle: List[tuple] = []  # (connection, returned_at)
+        self._size = 0  # open connections, idle or checked out
+        self._cond = threading.Condition()
+        self._closed = False
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.reconnects = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        for _ in range(self.min_size):
+            self._idle.append((psycopg2.connect(uri), time.monotonic()))
+            self._size += 1
+        _pools.append(self)
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for one operation"""
+        conn = self._acquire()
+        discard = False
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            discard = not self._rollback(conn)
+            raise
+        finally:
+            self._release(conn, discard)
+
+    def _acquire(self):
+        started = time.perf_counter()
+        deadline = started + self.timeout
+        conn, idle_since = None, None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise psycopg2.InterfaceError("connection pool is closed")
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1  # reserve a slot; connect outside the lock
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No database connection free after {self.timeout}s ({self.max_size} in use)"
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            if conn is not None and not self._healthy(conn, idle_since):
+                self.reconnects += 1
+                conn = None
+            if conn is None:
+                conn = psycopg2.connect(self.uri)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.perf_counter() - started
+        with self._cond:
+            self.checkouts += 1
+            if waited > 0.001:
+                self.waits += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        POOL_WAIT.observe(waited)
+        return conn
+
+    def _healthy(self, conn, idle_since: float) -> bool:
+        """False for closed connections, or idle ones that no longer answer"""
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < self.health_check_seconds:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            _close_quietly(conn)
+            return False
+
+    def _rollback(self, conn) -> bool:
+        """Roll back a failed operation; False if the connection is unusable"""
+        if conn.closed:
+            return False
+        try:
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _release(self, conn, discard: bool = False):
+        with self._cond:
+            if discard or conn.closed or self._closed:
+                self._size -= 1
+                _close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                _close_quietly(conn)
+                self._size -= 1
+            self._idle.clear()
+            self._cond.notify_all()
+        if self in _pools:
+            _pools.remove(self)
+
+    def stats(self) -> Dict:
+        """Snapshot of pool usage for monitoring"""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "reconnects": self.reconnects,
+                "avg_wait_ms": round(1000 * self.total_wait / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(1000 * self.max_wait, 3)
+            }
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
 
 class PostgresClient:
-    def __init__(self, uri: str):
+    def __init__(self, uri: str, min_size: int = 1, max_size: int = 10, timeout: float = 10.0,
+                 insert_batch_size: int = 500):
         self.uri = uri
-        self.conn = psycopg2.connect(uri)
+        self.insert_batch_size = insert_batch_size
+        self.pool = ConnectionPool(uri, min_size=min_size, max_size=max_size, timeout=timeout)
+        self._databases: Dict[str, PostgresDatabase] = {}
         # Create a mock 'admin' command for pinging
         self.admin = self
 
     def command(self, cmd: str):
         if cmd == 'ping':
-            with self.conn.cursor() as cur:
+            with self.pool.connection() as conn, conn.cursor() as cur:
                 cur.execute("SELECT 1")
             return {"ok": 1}
         return {}
 
     def __getitem__(self, name: str):
-        return PostgresDatabase(self.conn)
+        if name not in self._databases:
+            self._databases[name] = PostgresDatabase(self.pool, self.insert_batch_size)
+        return self._databases[name]
 
     def close(self):
-        self.conn.close()
+        self.pool.close()
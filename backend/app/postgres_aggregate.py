@@ -0,0 +1,398 @@
+"""
+Aggregation pipelines for the PostgreSQL adapter
+
+compile_pipeline turns the common $match -> $group -> $sort -> $limit shape into
+one SQL statement over the JSONB doc column. Pipelines it cannot translate are
+evaluated in Python by run_pipeline over a streamed cursor.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+FIELD_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z0-9_]+)*$")
+FILTER_OPERATORS = {"$ne", "$in", "$gt"}  # what PostgresCollection._build_where translates
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+# Group key for documents missing the grouped field, as the adapter has always reported it
+MISSING_GROUP_KEY = "Unknown"
+
+
+class UnsupportedPipeline(Exception):
+    """Pipeline shape that has no SQL translation"""
+
+
+# ---------------------------------------------------------------------------
+# SQL translation
+# ---------------------------------------------------------------------------
+
+def _field(expr: Any) -> str:
+    """Field name of a "$field" reference"""
+    if not isinstance(expr, str) or not expr.startswith("$") or not FIELD_PATTERN.match(expr[1:]):
+        raise UnsupportedPipeline(f"unsupported field reference {expr!r}")
+    return expr[1:]
+
+
+def _json_ref(field: str) -> str:
+    return "doc" + "".join(f"->'{part}'" for part in field.split("."))
+
+
+def _numeric(field: str) -> str:
+    """Numeric value of a field; NULL for non-numbers, which $sum/$avg skip"""
+    ref = _json_ref(field)
+    return f"CASE WHEN jsonb_typeof({ref}) = 'number' THEN ({ref})::numeric END"
+
+
+def _number(value: Any) -> str:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise UnsupportedPipeline(f"expected a numeric constant, got {value!r}")
+    return repr(value)
+
+
+def _condition(expr: Any, params: List[Any]) -> str:
+    """SQL boolean for a {$eq: ["$field", value]} style comparison"""
+    if not isinstance(expr, dict) or len(expr) != 1:
+        raise UnsupportedPipeline(f"unsupported condition {expr!r}")
+    op, args = next(iter(expr.items()))
+    if op not in ("$eq", "$ne") or not isinstance(args, list) or len(args) != 2:
+        raise UnsupportedPipeline(f"unsupported condition {expr!r}")
+    value = args[1]
+    if not isinstance(value, SCALAR_TYPES):
+        raise UnsupportedPipeline(f"unsupported comparison value {value!r}")
+    params.append(json.dumps(value))
+    ref = f"COALESCE({_json_ref(_field(args[0]))}, 'null'::jsonb)"
+    return f"{ref} {'=' if op == '$eq' else '<>'} %s::jsonb"
+
+
+def _accumulator(spec: Any, params: List[Any]) -> str:
+    if not isinstance(spec, dict) or len(spec) != 1:
+        raise UnsupportedPipeline(f"unsupported accumulator {spec!r}")
+    op, arg = next(iter(spec.items()))
+    if op == "$count":
+        return "COUNT(*)"
+    if op == "$avg":
+        return f"AVG({_numeric(_field(arg))})"
+    if op != "$sum":
+        raise UnsupportedPipeline(f"unsupported accumulator {op}")
+    if isinstance(arg, str):
+        return f"COALESCE(SUM({_numeric(_field(arg))}), 0)"
+    if isinstance(arg, dict) and "$cond" in arg:
+        cond = arg["$cond"]
+        if isinstance(cond, dict):
+            cond = [cond.get("if"), cond.get("then"), cond.get("else")]
+        if not isinstance(cond, list) or len(cond) != 3:
+            raise UnsupportedPipeline(f"unsupported $cond {cond!r}")
+        test = _condition(cond[0], params)
+        return f"COALESCE(SUM(CASE WHEN {test} THEN {_number(cond[1])} ELSE {_number(cond[2])} END), 0)"
+    return f"COUNT(*) * {_number(arg)}"
+
+
+def _group_key(key: Any) -> Tuple[str, List[str]]:
+    """SQL expression for the group _id and the expressions to GROUP BY"""
+    if key is None:
+        return "'null'::jsonb", []
+    if isinstance(key, str):
+        ref = _json_ref(_field(key))
+        expr = f"COALESCE({ref}, '{json.dumps(MISSING_GROUP_KEY)}'::jsonb)"
+        return expr, [expr]
+    if isinstance(key, dict) and key:
+        parts, group_by = [], []
+        for name, value in key.items():
+            if not FIELD_PATTERN.match(name):
+                raise UnsupportedPipeline(f"unsupported group key name {name!r}")
+            ref = _json_ref(_field(value))
+            parts.append(f"'{name}', {ref}")
+            group_by.append(ref)
+        return f"jsonb_build_object({', '.join(parts)})", group_by
+    raise UnsupportedPipeline(f"unsupported group key {key!r}")
+
+
+def _filter_supported(filter: Dict[str, Any]) -> bool:
+    """True if _build_where translates every condition of a $match filter"""
+    for key, value in filter.items():
+        if key == "$or":
+            if not isinstance(value, list) or not all(isinstance(f, dict) and _filter_supported(f) for f in value):
+                return False
+        elif key.startswith("$") or not FIELD_PATTERN.match(key):
+            return False
+        elif isinstance(value, dict):
+            if len(value) != 1 or next(iter(value)) not in FILTER_OPERATORS:
+                return False
+        elif not isinstance(value, SCALAR_TYPES) or isinstance(value, (bool, type(None))):
+            # _build_where compares text, which only agrees with MongoDB for strings and numbers
+            return False
+    return True
+
+
+def _order_by(sort: Dict[str, int], grouped: bool = False) -> str:
+    """ORDER BY terms over the base table, or over the doc column of grouped output"""
+    terms = []
+    for field, direction in sort.items():
+        if direction not in (1, -1):
+            raise UnsupportedPipeline(f"unsupported sort direction {direction!r}")
+        # Only the base table has an id column; grouped rows carry _id inside doc
+        ref = "id" if field == "_id" and not grouped else "doc" + "".join(
+            f"->'{part}'" for part in _field(f"${field}").split(".")
+        )
+        terms.append(f"{ref} {'ASC' if direction == 1 else 'DESC'} NULLS {'FIRST' if direction == 1 else 'LAST'}")
+    return ", ".join(terms)
+
+
+def split_leading_match(collection, pipeline: List[Dict[str, Any]]) -> Tuple[str, List[Any], List[Dict[str, Any]]]:
+    """WHERE clause for the leading translatable $match stages, plus the remaining stages"""
+    conditions, params = [], []
+    index = 0
+    while index < len(pipeline) and set(pipeline[index]) == {"$match"} and _filter_supported(pipeline[index]["$match"]):
+        condition, condition_params = collection._build_where(pipeline[index]["$match"])
+        if condition:
+            conditions.append(f"({condition})")
+            params.extend(condition_params)
+        index += 1
+    return " AND ".join(conditions), params, pipeline[index:]
+
+
+def compile_pipeline(collection, pipeline: List[Dict[str, Any]]) -> Optional[Tuple[str, List[Any]]]:
+    """One SQL statement returning the pipeline's output documents, or None if untranslatable"""
+    where, params, stages = split_leading_match(collection, pipeline)
+    group = sort = limit = None
+    for stage in stages:
+        if len(stage) != 1:
+            return None
+        name, spec = next(iter(stage.items()))
+        if name == "$group" and group is None and sort is None and limit is None:
+            group = spec
+        elif name == "$sort" and sort is None and limit is None and isinstance(spec, dict) and spec:
+            sort = spec
+        elif name == "$limit" and limit is None and isinstance(spec, int) and not isinstance(spec, bool) and spec > 0:
+            limit = spec
+        else:
+            return None
+
+    try:
+        where_sql = f" WHERE {where}" if where else ""
+        if group is None:
+            sql = f"SELECT doc FROM {collection.name}{where_sql}"
+            if sort:
+                sql += f" ORDER BY {_order_by(sort)}"
+        else:
+            if not isinstance(group, dict) or "_id" not in group:
+                return None
+            group_params: List[Any] = []
+            key_expr, group_by = _group_key(group["_id"])
+            fields = [f"'_id', {key_expr}"]
+            for name, spec in group.items():
+                if name == "_id":
+                    continue
+                if not FIELD_PATTERN.match(name):
+                    return None
+                fields.append(f"'{name}', {_accumulator(spec, group_params)}")
+            sql = f"SELECT jsonb_build_object({', '.join(fields)}) AS doc FROM {collection.name}{where_sql}"
+            if group_by:
+                sql += f" GROUP BY {', '.join(group_by)}"
+            else:
+                # Without GROUP BY SQL returns one row even for no input; MongoDB returns none
+                sql += " HAVING COUNT(*) > 0"
+            # Accumulator params appear in the SELECT list, ahead of the WHERE params
+            params = group_params + params
+            if sort:
+                sql = f"SELECT doc FROM ({sql}) grouped ORDER BY {_order_by(sort, grouped=True)}"
+        if limit:
+            sql += f" LIMIT {limit}"
+    except UnsupportedPipeline:
+        return None
+    return sql, params
+
+
+# ---------------------------------------------------------------------------
+# Python evaluation
+# ---------------------------------------------------------------------------
+
+_MISSING = object()
+
+
+def _get(doc: Dict[str, Any], path: str) -> Any:
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _value(doc: Dict[str, Any], expr: Any) -> Any:
+    """Evaluate an aggregation expression against a document"""
+    if isinstance(expr, str) and expr.startswith("$"):
+        value = _get(doc, expr[1:])
+        return None if value is _MISSING else value
+    if isinstance(expr, dict) and len(expr) == 1:
+        op, args = next(iter(expr.items()))
+        if op == "$cond":
+            if isinstance(args, dict):
+                args = [args.get("if"), args.get("then"), args.get("else")]
+            return _value(doc, args[1]) if _value(doc, args[0]) else _value(doc, args[2])
+        if op in _COMPARISONS:
+            left, right = (_value(doc, a) for a in args)
+            return _compare(op, left, right)
+    return expr
+
+
+def _compare(op: str, left: Any, right: Any) -> bool:
+    if op == "$eq":
+        return left == right
+    if op == "$ne":
+        return left != right
+    try:
+        return _COMPARISONS[op](left, right)
+    except TypeError:
+        return False
+
+
+_COMPARISONS = {
+    "$eq": None,
+    "$ne": None,
+    "$gt": lambda a, b: a > b,
+    "$gte": lambda a, b: a >= b,
+    "$lt": lambda a, b: a < b,
+    "$lte": lambda a, b: a <= b
+}
+
+
+def matches(doc: Dict[str, Any], filter: Dict[str, Any]) -> bool:
+    """MongoDB-style query filter evaluation for $match"""
+    for key, condition in filter.items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+            continue
+        if key == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+            continue
+        value = _get(doc, key)
+        if isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            for op, arg in condition.items():
+                present = value is not _MISSING
+                actual = value if present else None
+                if op == "$exists":
+                    ok = present == bool(arg)
+                elif op == "$in":
+                    ok = actual in arg or (isinstance(actual, list) and any(a in arg for a in actual))
+                elif op == "$nin":
+                    ok = actual not in arg
+                elif op in _COMPARISONS:
+                    ok = _compare(op, actual, arg) or (
+                        op == "$eq" and isinstance(actual, list) and arg in actual
+                    )
+                else:
+                    raise ValueError(f"Unsupported query operator {op}")
+                if not ok:
+                    return False
+        else:
+            actual = None if value is _MISSING else value
+            if not (actual == condition or (isinstance(actual, list) and condition in actual)):
+                return False
+    return True
+
+
+def _group(docs: Iterable[Dict[str, Any]], spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    key_spec = spec["_id"]
+    groups: Dict[str, Dict[str, Any]] = {}
+    states: Dict[str, Dict[str, List]] = {}
+    for doc in docs:
+        if isinstance(key_spec, dict):
+            key = {name: _value(doc, expr) for name, expr in key_spec.items()}
+        elif isinstance(key_spec, str) and key_spec.startswith("$"):
+            value = _get(doc, key_spec[1:])
+            key = MISSING_GROUP_KEY if value is _MISSING else value
+        else:
+            key = key_spec
+        hashable = json.dumps(key, sort_keys=True, default=str)
+        if hashable not in groups:
+            groups[hashable] = {"_id": key}
+            states[hashable] = {}
+        result, state = groups[hashable], states[hashable]
+
+        for name, accumulator in spec.items():
+            if name == "_id":
+                continue
+            op, arg = next(iter(accumulator.items()))
+            if op == "$count":
+                result[name] = result.get(name, 0) + 1
+            elif op == "$sum":
+                value = _value(doc, arg)
+                result[name] = result.get(name, 0) + (value if _is_number(value) else 0)
+            elif op == "$avg":
+                value = _value(doc, arg)
+                total, count = state.get(name, (0, 0))
+                if _is_number(value):
+                    total, count = total + value, count + 1
+                state[name] = (total, count)
+                result[name] = total / count if count else None
+            elif op in ("$min", "$max"):
+                value = _value(doc, arg)
+                if value is not None:
+                    current = result.get(name)
+                    if current is None or (value < current if op == "$min" else value > current):
+                        result[name] = value
+                else:
+                    result.setdefault(name, None)
+            elif op == "$push":
+                result.setdefault(name, []).append(_value(doc, arg))
+            elif op == "$addToSet":
+                items = result.setdefault(name, [])
+                value = _value(doc, arg)
+                if value not in items:
+                    items.append(value)
+            else:
+                raise ValueError(f"Unsupported accumulator {op}")
+    return list(groups.values())
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _sort_key(value: Any):
+    # None first, then numbers, then everything else by text, like MongoDB's type order
+    if value is None or value is _MISSING:
+        return (0, 0)
+    if _is_number(value):
+        return (1, value)
+    return (2, str(value))
+
+
+def _match_stage(stream: Iterator[Dict[str, Any]], filter: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    return (doc for doc in stream if matches(doc, filter))
+
+
+def _limit_stage(stream: Iterator[Dict[str, Any]], count: int) -> Iterator[Dict[str, Any]]:
+    return (doc for _, doc in zip(range(count), stream))
+
+
+def _skip_stage(stream: Iterator[Dict[str, Any]], count: int) -> Iterator[Dict[str, Any]]:
+    return (doc for i, doc in enumerate(stream) if i >= count)
+
+
+def run_pipeline(docs: Iterable[Dict[str, Any]], pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Evaluate pipeline stages over a document stream"""
+    stream: Iterator[Dict[str, Any]] = iter(docs)
+    for stage in pipeline:
+        name, spec = next(iter(stage.items()))
+        if name == "$match":
+            stream = _match_stage(stream, spec)
+        elif name == "$group":
+            stream = iter(_group(stream, spec))
+        elif name == "$sort":
+            ordered = list(stream)
+            for field, direction in reversed(list(spec.items())):
+                ordered.sort(key=lambda doc, field=field: _sort_key(_get(doc, field)), reverse=direction == -1)
+            stream = iter(ordered)
+        elif name == "$limit":
+            stream = _limit_stage(stream, spec)
+        elif name == "$skip":
+            stream = _skip_stage(stream, spec)
+        elif name == "$count":
+            stream = iter([{spec: sum(1 for _ in stream)}])
+        else:
+            raise ValueError(f"Unsupported aggregation stage {name}")
+    return list(stream)
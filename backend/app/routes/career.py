@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, Query, HTTPException
 from typing import Optional, List, Dict
 from ..utils.auth_utils import get_current_user
 from ..services.ai_service import ai_service
+from ..services.concurrency import llm_caller, LLMPriority
 from ..data import (
     get_all_domains,
     get_domain_by_id,
@@ -88,7 +89,10 @@ async def get_domain_detail(domain_id: str):
 
 
 @router.post("/recommend", response_model=CareerRecommendationResponse)
-async def get_career_recommendations(current_user: dict = Depends(get_current_user)):
+async def get_career_recommendations(
+    refresh: bool = Query(False, description="Bypass cached recommendations"),
+    current_user: dict = Depends(get_current_user)
+):
     """
     Generate AI-powered career recommendations for student
     Analyzes student profile, interests, branch, and completed tasks
@@ -100,12 +104,14 @@ async def get_career_recommendations(current_user: dict = Depends(get_current_us
         "skills": []  # Extracted from completed tasks
     }
     
-    result = await ai_service.career_recommendation(
-        branch=current_user["branch"],
-        interests=current_user.get("interests", []),
-        career_goal=current_user.get("career_goal", "Job"),
-        skills_analysis=skills_analysis if skills_analysis["skills"] else None
-    )
+    with llm_caller(LLMPriority.BULK, current_user["_id"]):
+        result = await ai_service.career_recommendation(
+            branch=current_user["branch"],
+            interests=current_user.get("interests", []),
+            career_goal=current_user.get("career_goal", "Job"),
+            skills_analysis=skills_analysis if skills_analysis["skills"] else None,
+            bypass_cache=refresh
+        )
     
     return {
         "recommendations": result,
@@ -118,12 +124,20 @@ async def get_career_recommendations(current_user: dict = Depends(get_current_us
 
 
 @router.post("/recommend/detailed", response_model=DetailedRecommendationResponse)
-async def get_detailed_recommendations(current_user: dict = Depends(get_current_user)):
+async def get_detailed_recommendations(
+    refresh: bool = Query(False, description="Bypass cached recommendations"),
+    current_user: dict = Depends(get_current_user)
+):
     """
     Get detailed AI career recommendations with domain matching scores
     Returns top 5 matching domains with reasoning and skill gap analysis
     """
-    
+    with llm_caller(LLMPriority.BULK, current_user["_id"]):
+        return await build_detailed_recommendations(current_user, refresh)
+
+
+async def build_detailed_recommendations(current_user: dict, refresh: bool = False) -> Dict:
+    """Detailed recommendations for a student profile (also run as a background job)"""
     branch = current_user.get("branch", "Computer Science")
     interests = current_user.get("interests", [])
     completed_tasks_count = current_user.get("completed_tasks", 0)
@@ -140,7 +154,14 @@ Student Profile:
 
     result = await ai_service.detailed_career_matching(
         student_context=student_context,
-        available_domains=get_all_domains()
+        available_domains=get_all_domains(),
+        bypass_cache=refresh,
+        student_profile={
+            "branch": branch,
+            "interests": interests,
+            "skills": current_user.get("skills", []),
+            "career_goal": current_user.get("career_goal")
+        }
     )
     
     return {
@@ -6,6 +6,7 @@ from bson import ObjectId
 from ..utils.auth_utils import get_current_user
 from ..database import get_collection
 from ..services.ai_service import ai_service
+from ..services.concurrency import llm_caller, LLMPriority
 from ..models.internship import InternshipCreate, InternshipUpdate, InternshipResponse, InternshipReviewResponse
 
 router = APIRouter(prefix="/api/internships", tags=["Internships"])
@@ -104,10 +105,11 @@ async def get_internship_ai_review(
         return {"error": "Internship not found"}
     
     # Get review from AI service
-    review_data = await ai_service.internship_review(
-        internship_data=internship,
-        student_profile=current_user
-    )
+    with llm_caller(LLMPriority.BULK, current_user["_id"]):
+        review_data = await ai_service.internship_review(
+            internship_data=internship,
+            student_profile=current_user
+        )
     
     # Optionally store the review in the database
     internships_collection.update_one(
@@ -0,0 +1,134 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from typing import Optional, Dict, Any
+from ..utils.auth_utils import get_current_user
+from ..services.ai_service import ai_service
+from ..services.job_queue import job_queue, JOB_SUCCEEDED, JOB_FAILED
+from ..data import get_domain_by_id
+from ..models.job import RoadmapJobRequest, InterviewPrepJobRequest, JobStatusResponse, JobResultResponse
+from .career import build_detailed_recommendations
+
+router = APIRouter(prefix="/api/jobs", tags=["AI Jobs"])
+
+# Profile fields copied into job params, so a profile change makes a new job
+PROFILE_FIELDS = ("branch", "interests", "skills", "career_goal", "completed_tasks", "cgpa")
+
+
+def _skill_names(skills) -> list:
+    return [s if isinstance(s, str) else s.get("name", "") for s in skills or []]
+
+
+def _get_domain(domain_id: str) -> Dict:
+    domain = get_domain_by_id(domain_id)
+    if not domain:
+        raise HTTPException(status_code=404, detail="Domain not found")
+    return domain
+
+
+async def _run_skill_roadmap(params: Dict[str, Any], student_id: str) -> Dict:
+    return await ai_service.generate_skill_roadmap(
+        target_domain=_get_domain(params["domain_id"]),
+        current_skills=params["current_skills"],
+        timeline_months=params["timeline_months"]
+    )
+
+
+async def _run_interview_prep(params: Dict[str, Any], student_id: str) -> Dict:
+    return await ai_service.interview_preparation(
+        target_domain=_get_domain(params["domain_id"]),
+        experience_level=params["experience_level"]
+    )
+
+
+async def _run_detailed_recommendations(params: Dict[str, Any], student_id: str) -> Dict:
+    return await build_detailed_recommendations(params["profile"], params.get("refresh", False))
+
+
+job_queue.register("skill_roadmap", _run_skill_roadmap)
+job_queue.register("interview_prep", _run_interview_prep)
+job_queue.register("detailed_recommendations", _run_detailed_recommendations)
+
+
+def _job_response(job: Dict, include_result: bool = False) -> Dict:
+    response = {
+        "job_id": job["_id"],
+        "type": job["type"],
+        "status": job["status"],
+        "attempts": job.get("attempts", 0),
+        "error": job.get("error"),
+        "created_at": job.get("created_at"),
+        "finished_at": job.get("finished_at")
+    }
+    if include_result:
+        response["result"] = job.get("result")
+    return response
+
+
+def _submit(job_type: str, current_user: dict, params: Dict, idempotency_key: Optional[str]) -> JSONResponse:
+    job, created = job_queue.submit(job_type, str(current_user["_id"]), params, idempotency_key)
+    payload = JobStatusResponse(**_job_response(job)).model_dump(mode="json")
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK,
+        content=payload,
+        headers={"Location": f"/api/jobs/{job['_id']}"}
+    )
+
+
+@router.post("/roadmap", response_model=JobStatusResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_roadmap_job(
+    request: RoadmapJobRequest,
+    idempotency_key: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """Queue a personalized skill roadmap; poll the returned job for the result"""
+    _get_domain(request.domain_id)
+    params = {
+        "domain_id": request.domain_id,
+        "timeline_months": request.timeline_months,
+        "current_skills": _skill_names(current_user.get("skills"))
+    }
+    return _submit("skill_roadmap", current_user, params, idempotency_key)
+
+
+@router.post("/interview-prep", response_model=JobStatusResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_interview_prep_job(
+    request: InterviewPrepJobRequest,
+    idempotency_key: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """Queue interview preparation guidance for a domain"""
+    _get_domain(request.domain_id)
+    params = {"domain_id": request.domain_id, "experience_level": request.experience_level}
+    return _submit("interview_prep", current_user, params, idempotency_key)
+
+
+@router.post("/recommendations/detailed", response_model=JobStatusResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_detailed_recommendations_job(
+    refresh: bool = Query(False, description="Bypass cached recommendations"),
+    idempotency_key: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """Queue detailed career recommendations (same result as /api/career/recommend/detailed)"""
+    profile = {field: current_user.get(field) for field in PROFILE_FIELDS if current_user.get(field) is not None}
+    params = {"profile": profile, "refresh": refresh}
+    return _submit("detailed_recommendations", current_user, params, idempotency_key)
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Current status of one of the student's jobs"""
+    job = job_queue.get(job_id, str(current_user["_id"]))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
+
+
+@router.get("/{job_id}/result", response_model=JobResultResponse)
+async def get_job_result(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Result of a finished job; 409 while it is still queued or running"""
+    job = job_queue.get(job_id, str(current_user["_id"]))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] not in (JOB_SUCCEEDED, JOB_FAILED):
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return _job_response(job, include_result=True)
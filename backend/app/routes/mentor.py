@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from typing import List
 from datetime import datetime, timezone
 from ..utils.auth_utils import get_current_user
+from ..utils.sse import format_sse, SSE_HEADERS
 from ..services.ai_service import ai_service
+from ..services.concurrency import llm_caller, LLMPriority
 from ..models.mentor import MentorChatRequest, MentorChatResponse, MotivationResponse, ProductivityTip
 
 router = APIRouter(prefix="/api/mentor", tags=["AI Mentor"])
@@ -16,10 +19,11 @@ async def chat_with_mentor(
 ):
     """Chat with AI mentor"""
     
-    response = await ai_service.mentor_chat(
-        user_message=request.message,
-        conversation_history=request.conversation_history
-    )
+    with llm_caller(LLMPriority.INTERACTIVE, current_user["_id"]):
+        response = await ai_service.mentor_chat(
+            user_message=request.message,
+            conversation_history=request.conversation_history
+        )
     
     return {
         "response": response,
@@ -27,10 +31,32 @@ async def chat_with_mentor(
     }
 
 
+@router.post("/chat/stream")
+async def chat_with_mentor_stream(
+    request: MentorChatRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Chat with AI mentor, streaming the reply as Server-Sent Events"""
+    # Answer 429 now; once streaming starts the status code is already sent
+    ai_service.scheduler.check_admission(LLMPriority.INTERACTIVE, str(current_user["_id"]))
+    
+    async def event_stream():
+        with llm_caller(LLMPriority.INTERACTIVE, current_user["_id"]):
+            async for chunk in ai_service.mentor_chat_stream(
+                user_message=request.message,
+                conversation_history=request.conversation_history
+            ):
+                yield format_sse({"token": chunk})
+        yield format_sse({"timestamp": datetime.now(timezone.utc).isoformat()}, event="done")
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.get("/motivation", response_model=MotivationResponse)
 async def get_motivation(current_user: dict = Depends(get_current_user)):
     """Get motivational message"""
     
+    # Served from the pre-generated pool, no LLM call on the request path
     message = await ai_service.generate_motivation()
     
     return {
@@ -4,6 +4,7 @@ from typing import List, Optional, Dict
 from ..utils.auth_utils import get_current_user
 from ..utils.file_utils import extract_text_from_pdf
 from ..services.ai_service import ai_service
+from ..services.concurrency import llm_caller, LLMPriority
 from ..database import get_collection
 from bson import ObjectId
 from datetime import datetime, timezone
@@ -27,12 +28,13 @@ async def generate_resume_content(
     
     projects_list = [p.model_dump() for p in resume_data.projects]
     
-    result = await ai_service.resume_content_generation(
-        projects=projects_list,
-        skills=resume_data.skills,
-        branch=current_user["branch"],
-        target_domain=resume_data.target_domain
-    )
+    with llm_caller(LLMPriority.BULK, current_user["_id"]):
+        result = await ai_service.resume_content_generation(
+            projects=projects_list,
+            skills=resume_data.skills,
+            branch=current_user["branch"],
+            target_domain=resume_data.target_domain
+        )
     
     return result
 
@@ -44,10 +46,11 @@ async def check_ats_score(
 ):
     """Check ATS score for resume"""
     
-    result = await ai_service.ats_analysis(
-        resume_text=request.resume_text,
-        job_description=request.job_description
-    )
+    with llm_caller(LLMPriority.BULK, current_user["_id"]):
+        result = await ai_service.ats_analysis(
+            resume_text=request.resume_text,
+            job_description=request.job_description
+        )
     
     return result
 
@@ -69,10 +72,11 @@ async def check_ats_score_upload(
     if not resume_text:
         raise HTTPException(status_code=400, detail="Could not extract text from the PDF file")
     
-    result = await ai_service.ats_analysis(
-        resume_text=resume_text,
-        job_description=job_description
-    )
+    with llm_caller(LLMPriority.BULK, current_user["_id"]):
+        result = await ai_service.ats_analysis(
+            resume_text=resume_text,
+            job_description=job_description
+        )
     
     return result
 
@@ -1,7 +1,12 @@
 from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
 from typing import Dict
 from ..utils.auth_utils import get_current_user, require_admin
 from ..database import get_collection
+from ..services.ai_service import ai_service
+from ..services.job_queue import job_queue
+from ..services.ai_metrics import registry as metrics_registry
+from ..utils.file_utils import pdf_text_cache
 from bson import ObjectId
 
 router = APIRouter(prefix="/api/stats", tags=["Statistics"])
@@ -162,3 +167,19 @@ async def get_admin_stats(current_user: dict = Depends(require_admin)):
         "high_requirements": high_requirements[:5],
         "ai_interactions": total_tasks * 3 # Estimated
     }
+
+
+@router.get("/ai")
+async def get_ai_stats(current_user: dict = Depends(require_admin)):
+    """Get runtime statistics of the AI service (LLM concurrency, queueing, background jobs)"""
+    return {
+        **ai_service.get_runtime_stats(),
+        "pdf_text_cache": pdf_text_cache.stats(),
+        "jobs": job_queue.stats()
+    }
+
+
+@router.get("/ai/metrics", response_class=PlainTextResponse)
+async def get_ai_metrics(current_user: dict = Depends(require_admin)):
+    """AI call metrics (latency histograms, token counts, cache and fallback rates) for Prometheus"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
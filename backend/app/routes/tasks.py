@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.responses import StreamingResponse
 from datetime import datetime, timezone
 from bson import ObjectId
 from typing import List
@@ -10,8 +11,12 @@ from ..models.task import (
     ConversationMessage
 )
 from ..database import get_collection
+from ..config import settings
 from ..utils.auth_utils import get_current_user
+from ..utils.sse import format_sse, SSE_HEADERS
 from ..services.ai_service import ai_service
+from ..services.concurrency import llm_caller, LLMPriority
+from ..services.conversation_summary import schedule_task_summary
 
 router = APIRouter(prefix="/api/tasks", tags=["Tasks"])
 
@@ -101,6 +106,78 @@ async def get_task_assistance(
     current_user: dict = Depends(get_current_user)
 ):
     """Get AI assistance for a task"""
+    task = _get_student_task(task_id, current_user)
+    student_history = _get_student_history(current_user)
+    asked_at = datetime.now(timezone.utc)
+    
+    # Get AI response
+    with llm_caller(LLMPriority.ASSIST, current_user["_id"]):
+        ai_response = await ai_service.academic_assistance(
+            task_description=f"{task['title']}: {task['description']}\n\nStudent question: {request.message}",
+            branch=current_user["branch"],
+            task_type=task["type"],
+            student_history=student_history,
+            conversation_summary=task.get("conversation_summary"),
+            conversation_history=task.get("conversation_history")
+        )
+    
+    # Append rather than write back the history loaded before the LLM call, which a
+    # background summary may have folded in the meantime
+    turns = _append_assistance_turn(task, request.message, asked_at, ai_response)
+    conversation_history = task.get("conversation_history", []) + turns
+    
+    if len(conversation_history) > settings.task_summary_trigger_turns:
+        schedule_task_summary(task["_id"])
+    
+    return TaskAssistanceResponse(
+        response=ai_response,
+        conversation_history=[
+            ConversationMessage(**msg) for msg in conversation_history
+        ]
+    )
+
+
+@router.post("/{task_id}/assist/stream")
+async def stream_task_assistance(
+    task_id: str,
+    request: TaskAssistanceRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get AI assistance for a task, streamed as Server-Sent Events"""
+    task = _get_student_task(task_id, current_user)
+    student_history = _get_student_history(current_user)
+    asked_at = datetime.now(timezone.utc)
+    # Answer 429 now; once streaming starts the status code is already sent
+    ai_service.scheduler.check_admission(LLMPriority.ASSIST, str(current_user["_id"]))
+    
+    async def event_stream():
+        chunks = []
+        completed = False
+        try:
+            with llm_caller(LLMPriority.ASSIST, current_user["_id"]):
+                async for chunk in ai_service.academic_assistance_stream(
+                    task_description=f"{task['title']}: {task['description']}\n\nStudent question: {request.message}",
+                    branch=current_user["branch"],
+                    task_type=task["type"],
+                    student_history=student_history,
+                    conversation_summary=task.get("conversation_summary"),
+                    conversation_history=task.get("conversation_history")
+                ):
+                    chunks.append(chunk)
+                    yield format_sse({"token": chunk})
+            completed = True
+            yield format_sse({"timestamp": datetime.now(timezone.utc).isoformat()}, event="done")
+        finally:
+            # Runs on normal completion and on client disconnect, so partial answers are kept
+            _append_assistance_turn(task, request.message, asked_at, "".join(chunks), interrupted=not completed)
+            if len(task.get("conversation_history", [])) + 2 > settings.task_summary_trigger_turns:
+                schedule_task_summary(task["_id"])
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+def _get_student_task(task_id: str, current_user: dict) -> dict:
+    """Load a task owned by the current student or raise 400/404"""
     tasks_collection = get_collection("tasks")
     
     try:
@@ -111,7 +188,11 @@ async def get_task_assistance(
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    # Get student's activity history for context
+    return task
+
+
+def _get_student_history(current_user: dict):
+    """Collect weak/strong areas from the student's recent activities, or None if there are none"""
     activities_collection = get_collection("activities")
     activities = list(activities_collection.find({"student_id": str(current_user["_id"])}).limit(10))
     
@@ -122,47 +203,44 @@ async def get_task_assistance(
     for activity in activities:
         student_history["weak_areas"].extend(activity.get("weak_areas", []))
         student_history["strong_areas"].extend(activity.get("strong_areas", []))
-
     
-    # Get AI response
-    ai_response = await ai_service.academic_assistance(
-        task_description=f"{task['title']}: {task['description']}\n\nStudent question: {request.message}",
-        branch=current_user["branch"],
-        task_type=task["type"],
-        student_history=student_history if student_history["weak_areas"] or student_history["strong_areas"] else None
-    )
+    if not student_history["weak_areas"] and not student_history["strong_areas"]:
+        return None
+    return student_history
+
+
+def _append_assistance_turn(task: dict, question: str, asked_at: datetime, answer: str, interrupted: bool = False):
+    """Append a question/answer pair to the task conversation without rewriting the whole history.
+
+    Returns the two appended turns.
+    """
+    tasks_collection = get_collection("tasks")
     
-    # Update conversation history
-    conversation_history = task.get("conversation_history", [])
-    conversation_history.append({
-        "role": "user",
-        "content": request.message,
-        "timestamp": datetime.now(timezone.utc)
-    })
-    conversation_history.append({
+    assistant_message = {
         "role": "assistant",
-        "content": ai_response,
+        "content": answer,
         "timestamp": datetime.now(timezone.utc)
-    })
+    }
+    if interrupted:
+        assistant_message["interrupted"] = True
     
-    # Update task
+    turns = [
+        {"role": "user", "content": question, "timestamp": asked_at},
+        assistant_message
+    ]
     tasks_collection.update_one(
-        {"_id": ObjectId(task_id)},
+        {"_id": task["_id"]},
         {
+            "$push": {
+                "conversation_history": {"$each": turns}
+            },
             "$set": {
-                "conversation_history": conversation_history,
                 "ai_assistance_used": True,
                 "status": "in-progress" if task["status"] == "pending" else task["status"]
             }
         }
     )
-    
-    return TaskAssistanceResponse(
-        response=ai_response,
-        conversation_history=[
-            ConversationMessage(**msg) for msg in conversation_history
-        ]
-    )
+    return turns
 
 
 @router.put("/{task_id}/complete")
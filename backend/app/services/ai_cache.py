@@ -0,0 +1,167 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from ..database import get_collection
+
+
+def prompt_fingerprint(messages: List[Dict[str, str]], **params) -> str:
+    """Stable hash of prompt messages and generation parameters.
+
+    Whitespace inside message content is collapsed so prompts that only differ
+    in indentation or blank lines share a cache entry.
+    """
+    normalized = [
+        {"role": m.get("role", ""), "content": " ".join(str(m.get("content", "")).split())}
+        for m in messages
+    ]
+    payload = json.dumps({"messages": normalized, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def content_hash(*parts: str) -> str:
+    """Stable hash of text parts with whitespace collapsed (e.g. resume text plus job description)"""
+    normalized = [" ".join(str(part or "").split()) for part in parts]
+    return hashlib.sha256("\x00".join(normalized).encode("utf-8")).hexdigest()
+
+
+class TTLLRUCache:
+    """Bounded in-process cache with per-entry expiry and LRU eviction"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: float):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Snapshot of cache counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class SharedResponseCache:
+    """Second-tier response cache stored in the `ai_cache` collection.
+
+    Shared by every worker and kept across restarts. Expiry is enforced by a TTL
+    index (MongoDB) or an indexed expires_at column (Postgres adapter); reads also
+    check expires_at because TTL purges run periodically, not instantly.
+    """
+
+    COLLECTION = "ai_cache"
+
+    def __init__(self):
+        self._index_ready = False
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _collection(self):
+        collection = get_collection(self.COLLECTION)
+        if collection is not None and not self._index_ready:
+            collection.create_index("expires_at", expireAfterSeconds=0)
+            self._index_ready = True
+        return collection
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """Return (response, remaining_ttl_seconds) for a live entry, else None"""
+        try:
+            collection = self._collection()
+            if collection is None:
+                return None
+            entry = collection.find_one({"_id": key})
+        except Exception as e:
+            print(f"AI cache read error: {e}")
+            self.errors += 1
+            return None
+
+        remaining = _seconds_until(entry.get("expires_at")) if entry else 0
+        if remaining <= 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["response"], remaining
+
+    def set(self, key: str, value: str, ttl_seconds: float):
+        now = datetime.now(timezone.utc)
+        try:
+            collection = self._collection()
+            if collection is None:
+                return
+            collection.replace_one(
+                {"_id": key},
+                {
+                    "_id": key,
+                    "response": value,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=ttl_seconds)
+                },
+                upsert=True
+            )
+        except Exception as e:
+            print(f"AI cache write error: {e}")
+            self.errors += 1
+
+    def stats(self) -> Dict:
+        """Snapshot of shared cache counters for this worker"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+def _seconds_until(expires_at) -> float:
+    """Seconds left before an expires_at value (datetime or ISO string) passes"""
+    if isinstance(expires_at, str):
+        try:
+            expires_at = datetime.fromisoformat(expires_at)
+        except ValueError:
+            return 0
+    if not isinstance(expires_at, datetime):
+        return 0
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return (expires_at - datetime.now(timezone.utc)).total_seconds()
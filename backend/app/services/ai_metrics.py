@@ -0,0 +1,235 @@
+import bisect
+import functools
+import inspect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Seconds; LLM calls range from cache hits (~ms) to long generations (~20s deadline)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+INF_BUCKET = 'le="+Inf"'
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List] = {}  # labels -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((labels, ([*s[0]], s[1], s[2])) for labels, s in self._series.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                yield f"{self.name}_bucket{le} {cumulative}"
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, INF_BUCKET)} {count}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}"
+
+
+class Gauge:
+    """Gauge read from a callback at scrape time"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...],
+                 collect: Callable[[], Iterable[Tuple[LabelValues, float]]]):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.collect = collect
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.collect():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                print(f"Metrics collection error ({metric.name}): {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+METHOD_DURATION = registry.register(Histogram(
+    "ai_method_duration_seconds", "End-to-end latency of AIService methods", ("method",)
+))
+LLM_CALL_DURATION = registry.register(Histogram(
+    "ai_llm_call_duration_seconds", "Upstream LLM provider latency", ("method", "outcome")
+))
+LLM_QUEUE_WAIT = registry.register(Histogram(
+    "ai_llm_queue_wait_seconds", "Time spent waiting for an LLM slot", ("method",)
+))
+PROMPT_CHARS = registry.register(Counter(
+    "ai_prompt_chars_total", "Characters sent to the LLM", ("method",)
+))
+PROMPT_TOKENS = registry.register(Counter(
+    "ai_prompt_tokens_total", "Estimated prompt tokens sent to the LLM", ("method",)
+))
+RESPONSE_CHARS = registry.register(Counter(
+    "ai_response_chars_total", "Characters received from the LLM", ("method",)
+))
+RESPONSE_TOKENS = registry.register(Counter(
+    "ai_response_tokens_total", "Estimated response tokens received from the LLM", ("method",)
+))
+FALLBACKS = registry.register(Counter(
+    "ai_fallbacks_total", "Responses answered locally instead of by the LLM", ("method", "reason")
+))
+UNPARSEABLE = registry.register(Counter(
+    "ai_unparseable_responses_total", "Responses that did not fit the expected JSON schema", ("method",)
+))
+SAFETY_BLOCKS = registry.register(Counter(
+    "ai_safety_blocks_total", "LLM responses blocked by safety filters", ("method",)
+))
+CACHE_LOOKUPS = registry.register(Counter(
+    "ai_cache_lookups_total", "Response cache lookups by tier and result", ("method", "tier", "result")
+))
+
+_current_method: ContextVar[Optional[str]] = ContextVar("ai_method", default=None)
+
+
+def current_method() -> str:
+    """AIService method the current LLM call is made for"""
+    return _current_method.get() or "chat_completion"
+
+
+def instrumented(func):
+    """Time an AIService method and label the LLM calls it makes with its name.
+
+    Works for coroutines and async generators (streams are timed until exhausted).
+    Calls made from inside another instrumented method keep the outer name.
+    """
+    name = func.__name__
+
+    if inspect.isasyncgenfunction(func):
+        @functools.wraps(func)
+        async def stream_wrapper(*args, **kwargs):
+            if _current_method.get():
+                async for item in func(*args, **kwargs):
+                    yield item
+                return
+            token = _current_method.set(name)
+            started = time.perf_counter()
+            try:
+                async for item in func(*args, **kwargs):
+                    yield item
+            finally:
+                METHOD_DURATION.observe(time.perf_counter() - started, name)
+                try:
+                    _current_method.reset(token)
+                except ValueError:
+                    # Streams can be finalized from another context
+                    _current_method.set(None)
+        return stream_wrapper
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if _current_method.get():
+            return await func(*args, **kwargs)
+        token = _current_method.set(name)
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            METHOD_DURATION.observe(time.perf_counter() - started, name)
+            _current_method.reset(token)
+    return wrapper
+
+
+def record_exchange(method: str, messages: List[Dict[str, str]], response: Optional[str]):
+    """Count prompt and response size for one upstream call"""
+    from .context_builder import estimate_tokens
+
+    prompt_chars = sum(len(m.get("content", "")) for m in messages)
+    PROMPT_CHARS.inc(method, amount=prompt_chars)
+    PROMPT_TOKENS.inc(method, amount=sum(estimate_tokens(m.get("content", "")) for m in messages))
+    if response:
+        RESPONSE_CHARS.inc(method, amount=len(response))
+        RESPONSE_TOKENS.inc(method, amount=estimate_tokens(response))
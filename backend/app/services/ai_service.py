@@ -1,138 +1,417 @@
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, AsyncIterator
+import asyncio
 import json
-import re
 import random
+import time
 from datetime import datetime, timezone
 
-try:
-    from google import genai
-    from google.genai import types
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
+from pydantic import ValidationError
 from ..config import settings
+from ..models.ai_outputs import (
+    CareerPathsOutput, CareerMatchesOutput, ATSSuggestionsOutput, SkillRoadmapOutput, MotivationBatchOutput
+)
+from .concurrency import LLMScheduler, LLMPriority, LLMQueueFullError, SingleFlight, llm_caller
+from .ai_cache import TTLLRUCache, SharedResponseCache, prompt_fingerprint, content_hash
+from .context_builder import build_context, truncate_to_tokens
+from .circuit_breaker import CircuitBreaker
+from .career_matcher import get_matcher
+from .ats_scorer import get_ats_scorer, local_suggestions
+from .llm_providers import create_provider
+from .motivation_pool import MotivationPool
+from .intent_matcher import IntentMatcher, load_intents
+from .ai_metrics import (
+    instrumented, current_method, record_exchange, registry, Gauge,
+    LLM_CALL_DURATION, LLM_QUEUE_WAIT, FALLBACKS, SAFETY_BLOCKS, UNPARSEABLE, CACHE_LOOKUPS
+)
 
 
 class AIService:
-    """AI Service for LLM integrations - Exclusively using Gemini 2.0 Flash"""
+    """AI Service for LLM integrations - Gemini 2.0 Flash by default (see llm_providers)"""
+    
+    # Response cache TTLs (seconds) for prompts built from shared profile fields
+    CACHE_TTL_SECONDS = {
+        "career_recommendation": 6 * 3600,
+        "detailed_career_matching": 6 * 3600,
+        "generate_skill_roadmap": 24 * 3600,
+        "interview_preparation": 24 * 3600
+    }
     
     def __init__(self):
-        if GEMINI_AVAILABLE and settings.gemini_api_key:
-            self.client = genai.Client(api_key=settings.gemini_api_key)
-            self.model = "gemini-2.0-flash"
+        self.provider = create_provider()
+        if self.provider:
+            self.model = self.provider.model
         else:
             print("Warning: Gemini initialization failed. Check API key and google-genai package.")
-            self.client = None
             self.model = None
+        self.scheduler = LLMScheduler(
+            settings.llm_max_concurrency,
+            max_queue_depth={
+                LLMPriority.INTERACTIVE: settings.llm_queue_depth_interactive,
+                LLMPriority.ASSIST: settings.llm_queue_depth_assist,
+                LLMPriority.BULK: settings.llm_queue_depth_bulk
+            },
+            max_queued_per_user=settings.llm_queue_depth_per_user
+        )
+        self.response_cache = TTLLRUCache(settings.ai_cache_max_entries)
+        self.shared_cache = SharedResponseCache()
+        self.ats_cache = TTLLRUCache(settings.ats_cache_max_entries)
+        self.single_flight = SingleFlight()
+        self.motivation_pool = MotivationPool(
+            self.generate_motivation_batch,
+            capacity=settings.motivation_pool_size,
+            batch_size=settings.motivation_batch_size,
+            refresh_seconds=settings.motivation_refresh_seconds
+        )
+        self.intent_matcher = IntentMatcher(load_intents(settings.fallback_intents_path))
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.llm_breaker_failure_threshold,
+            reset_timeout=settings.llm_breaker_reset_seconds,
+            slow_call_seconds=settings.llm_slow_call_seconds
+        )
     
-    def _convert_messages_for_gemini(self, messages: List[Dict[str, str]]) -> tuple:
-        """Convert OpenAI-style messages to Gemini format"""
-        gemini_messages = []
-        system_instruction = None
-        
-        for msg in messages:
-            role = msg.get("role")
-            content = msg.get("content", "")
-            
-            if role == "system":
-                system_instruction = content
-            elif role == "user":
-                gemini_messages.append(types.Content(
-                    role="user",
-                    parts=[types.Part.from_text(text=content)]
-                ))
-            elif role == "assistant":
-                gemini_messages.append(types.Content(
-                    role="model", 
-                    parts=[types.Part.from_text(text=content)]
-                ))
-                
-        return system_instruction, gemini_messages
+    def get_runtime_stats(self) -> Dict:
+        """Runtime statistics for monitoring the AI layer"""
+        stats = {
+            "circuit_breaker": self.breaker.stats(),
+            "concurrency": self.scheduler.stats(),
+            "coalescing": self.single_flight.stats(),
+            "cache": self.response_cache.stats(),
+            "shared_cache": self.shared_cache.stats(),
+            "ats_cache": self.ats_cache.stats(),
+            "motivation_pool": self.motivation_pool.stats()
+        }
+        if hasattr(self.provider, "stats"):
+            stats["replay"] = self.provider.stats()
+        return stats
     
+    @instrumented
     async def chat_completion(
         self, 
         messages: List[Dict[str, str]], 
         temperature: float = 0.7,
-        max_tokens: int = 500
-    ) -> str:
-        """Generate chat completion using Gemini"""
+        max_tokens: int = 500,
+        cache_ttl: Optional[float] = None,
+        bypass_cache: bool = False,
+        allow_fallback: bool = True,
+        response_schema: Optional[type] = None
+    ) -> Optional[str]:
+        """Generate chat completion using Gemini
+        
+        When cache_ttl is given, successful responses are cached under a hash of the
+        prompt and generation parameters. bypass_cache skips the lookup but still
+        refreshes the cached entry. Concurrent calls with the same prompt share one
+        upstream request. With allow_fallback=False a failed call returns None
+        instead of a canned fallback response. A pydantic response_schema switches
+        Gemini to JSON mode constrained to that schema.
+        """
+        fingerprint = prompt_fingerprint(
+            messages,
+            model=self.model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            schema=response_schema.__name__ if response_schema else None
+        )
+        use_cache = bool(cache_ttl) and settings.ai_cache_enabled
+        
+        if use_cache and not bypass_cache:
+            method = current_method()
+            cached = self.response_cache.get(fingerprint)
+            CACHE_LOOKUPS.inc(method, "local", "hit" if cached is not None else "miss")
+            if cached is not None:
+                return cached
+            if settings.ai_shared_cache_enabled:
+                shared = self.shared_cache.get(fingerprint)
+                CACHE_LOOKUPS.inc(method, "shared", "hit" if shared is not None else "miss")
+                if shared is not None:
+                    text, remaining_ttl = shared
+                    self.response_cache.set(fingerprint, text, remaining_ttl)
+                    return text
+        
+        return await self.single_flight.run(
+            fingerprint if allow_fallback else f"{fingerprint}:strict",
+            lambda: self._generate(
+                messages, temperature, max_tokens, fingerprint if use_cache else None, cache_ttl, allow_fallback,
+                response_schema
+            )
+        )
+    
+    async def _generate(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        cache_key: Optional[str] = None,
+        cache_ttl: Optional[float] = None,
+        allow_fallback: bool = True,
+        response_schema: Optional[type] = None
+    ) -> Optional[str]:
+        """Single upstream provider call with fallback handling; caches the result under cache_key"""
+        method = current_method()
         try:
-            if self.client and settings.gemini_api_key:
-                system_instruction, gemini_messages = self._convert_messages_for_gemini(messages)
-                
-                config = types.GenerateContentConfig(
-                    system_instruction=system_instruction,
-                    temperature=temperature,
-                    max_output_tokens=max_tokens
-                )
+            if self.provider:
+                # Reject before touching the breaker so a full queue is not counted as a probe
+                self.scheduler.check_admission()
+                admission = self.breaker.allow_request()
+                if not admission:
+                    # Circuit open: answer locally instead of waiting on a degraded upstream
+                    return self._fallback(messages, "circuit_open") if allow_fallback else None
                 
-                response = self.client.models.generate_content(
-                    model=self.model,
-                    contents=gemini_messages,
-                    config=config
-                )
+                # Providers are async so the event loop stays free; the scheduler caps in-flight
+                # calls and orders waiters by priority and user (see llm_caller)
+                async with self.scheduler.slot() as waited:
+                    LLM_QUEUE_WAIT.observe(waited, method)
+                    started = time.perf_counter()
+                    outcome = "error"
+                    try:
+                        # None means the provider's safety filters blocked the response
+                        text = await asyncio.wait_for(
+                            self.provider.generate(messages, temperature, max_tokens, response_schema),
+                            timeout=settings.llm_call_timeout_seconds
+                        )
+                        outcome = "ok" if text else "blocked"
+                    except asyncio.TimeoutError:
+                        outcome = "timeout"
+                        raise
+                    finally:
+                        duration = time.perf_counter() - started
+                        self.breaker.record(admission, outcome in ("ok", "blocked"), duration)
+                        LLM_CALL_DURATION.observe(duration, method, outcome)
+                record_exchange(method, messages, text)
                 
-                # Check for response text (safety filters might block it)
-                try:
-                    return response.text
-                except (ValueError, AttributeError):
+                if not text:
                     # If blocked, try to get fallback based on user message
-                    print("Warning: Gemini response blocked by safety filters.")
-                    user_msg = messages[-1]["content"] if messages else ""
-                    return self._get_fallback_response(user_msg)
+                    print("Warning: LLM response blocked by safety filters.")
+                    SAFETY_BLOCKS.inc(method)
+                    return self._fallback(messages, "safety_block") if allow_fallback else None
+                
+                # A truncated or malformed structured answer would otherwise be served for the whole TTL
+                if cache_key and (response_schema is None or self._matches_schema(text, response_schema)):
+                    self.response_cache.set(cache_key, text, cache_ttl)
+                    if settings.ai_shared_cache_enabled:
+                        self.shared_cache.set(cache_key, text, cache_ttl)
+                return text
             
+            elif not allow_fallback:
+                return None
             else:
+                FALLBACKS.inc(method, "no_provider")
                 return "AI provider not available. Please check your Gemini API configuration."
 
-        
+        except LLMQueueFullError:
+            # Surfaced to the client as 429 with Retry-After
+            raise
         except Exception as e:
-            print(f"AI Error: {e}")
+            if isinstance(e, asyncio.TimeoutError):
+                print(f"AI Error: LLM call exceeded the {settings.llm_call_timeout_seconds}s deadline")
+            else:
+                print(f"AI Error: {e}")
+            if not allow_fallback:
+                return None
             # Use intelligent fallback on failure
-            user_msg = messages[-1]["content"] if messages else ""
-            return self._get_fallback_response(user_msg)
+            return self._fallback(messages, "timeout" if isinstance(e, asyncio.TimeoutError) else "error")
+    
+    def _fallback(self, messages: List[Dict[str, str]], reason: str) -> str:
+        """Local fallback answer to the last message, counted by reason"""
+        FALLBACKS.inc(current_method(), reason)
+        user_msg = messages[-1]["content"] if messages else ""
+        return self._get_fallback_response(user_msg)
+    
+    @instrumented
+    async def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 500
+    ) -> AsyncIterator[str]:
+        """Stream a chat completion from Gemini, yielding text chunks as they arrive"""
+        method = current_method()
+        
+        if not self.provider:
+            FALLBACKS.inc(method, "no_provider")
+            yield "AI provider not available. Please check your Gemini API configuration."
+            return
+        
+        try:
+            self.scheduler.check_admission()
+        except LLMQueueFullError:
+            # Stream routes check admission before responding; this only covers a race
+            yield self._fallback(messages, "queue_full")
+            return
+        
+        admission = self.breaker.allow_request()
+        if not admission:
+            yield self._fallback(messages, "circuit_open")
+            return
+        
+        chunks = []
+        outcome = "error"
+        try:
+            async with self.scheduler.slot() as waited:
+                LLM_QUEUE_WAIT.observe(waited, method)
+                started = time.perf_counter()
+                first_token_after = None
+                stream = self.provider.stream(messages, temperature, max_tokens)
+                try:
+                    # The deadline applies to the first chunk and to each gap between chunks
+                    while True:
+                        try:
+                            text = await asyncio.wait_for(stream.__anext__(), timeout=settings.llm_call_timeout_seconds)
+                        except StopAsyncIteration:
+                            break
+                        if text:
+                            if first_token_after is None:
+                                first_token_after = time.perf_counter() - started
+                            chunks.append(text)
+                            yield text
+                    outcome = "ok" if chunks else "blocked"
+                except asyncio.TimeoutError:
+                    outcome = "timeout"
+                    raise
+                finally:
+                    # Judge the breaker on time to first token, not on total stream length
+                    latency = first_token_after if first_token_after is not None else time.perf_counter() - started
+                    self.breaker.record(admission, outcome in ("ok", "blocked") or bool(chunks), latency)
+                    LLM_CALL_DURATION.observe(time.perf_counter() - started, method, outcome)
+                    record_exchange(method, messages, "".join(chunks))
+                    await stream.aclose()
+        except Exception as e:
+            print(f"AI Streaming Error: {e!r}")
+        
+        # Nothing usable came back (error or safety block): answer with the local fallback
+        if not chunks:
+            if outcome == "blocked":
+                SAFETY_BLOCKS.inc(method)
+                yield self._fallback(messages, "safety_block")
+            else:
+                yield self._fallback(messages, outcome)
             
     def _extract_json(self, text: str) -> Dict:
-        """Helper to extract and parse JSON from LLM response safely"""
+        """Helper to extract and parse JSON from LLM response safely
+        
+        Fallback for responses that did not come back as clean JSON: a single pass
+        over the text finds balanced top-level {...} spans (ignoring braces inside
+        strings) and returns the first one that parses to an object.
+        """
         if not text or not isinstance(text, str):
             return {}
             
         try:
             # Try direct parse
-            return json.loads(text.strip())
+            parsed = json.loads(text.strip())
+            if isinstance(parsed, dict):
+                return parsed
         except json.JSONDecodeError:
-            # Try to find JSON block inside markdown or text
-            
-            # 1. Look for ```json ... ```
-            json_block_match = re.search(r'```json\s*(.*?)\s*```', text, re.DOTALL)
-            if json_block_match:
-                try:
-                    return json.loads(json_block_match.group(1))
-                except json.JSONDecodeError:
-                    pass
-            
-            # 2. Look for any block between { and }
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                try:
-                    return json.loads(json_match.group())
-                except json.JSONDecodeError:
-                    pass
-            
-            return {"error": "Failed to parse AI response as JSON", "raw_content": text}
+            pass
+        
+        depth = 0
+        start = -1
+        in_string = False
+        escaped = False
+        for i, ch in enumerate(text):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = depth > 0
+            elif ch == "{":
+                if depth == 0:
+                    start = i
+                depth += 1
+            elif ch == "}" and depth > 0:
+                depth -= 1
+                if depth == 0:
+                    try:
+                        parsed = json.loads(text[start:i + 1])
+                        if isinstance(parsed, dict):
+                            return parsed
+                    except json.JSONDecodeError:
+                        pass
+        
+        return {"error": "Failed to parse AI response as JSON", "raw_content": text}
+    
+    def _matches_schema(self, text: str, model: type) -> bool:
+        """Whether a JSON-mode response validates against its schema"""
+        try:
+            model.model_validate_json(text)
+            return True
+        except ValidationError:
+            return False
     
+    def _parse_structured(self, text: Optional[str], model: type):
+        """Validate an LLM response into a pydantic model, or None if it doesn't fit"""
+        if not text:
+            return None
+        try:
+            return model.model_validate_json(text)
+        except ValidationError:
+            pass
+        try:
+            return model.model_validate(self._extract_json(text))
+        except ValidationError:
+            # Callers fall back to raw text or local results
+            UNPARSEABLE.inc(current_method())
+            return None
+    
+    @instrumented
     async def academic_assistance(
         self, 
         task_description: str,
         branch: str,
         task_type: str,
-        student_history: Optional[Dict] = None
+        student_history: Optional[Dict] = None,
+        conversation_summary: Optional[str] = None,
+        conversation_history: Optional[List[Dict]] = None
     ) -> str:
         """Provide academic assistance"""
+        messages = self._build_academic_messages(
+            task_description, branch, task_type, student_history, conversation_summary, conversation_history
+        )
+        return await self.chat_completion(messages, temperature=0.7)
+    
+    @instrumented
+    async def academic_assistance_stream(
+        self, 
+        task_description: str,
+        branch: str,
+        task_type: str,
+        student_history: Optional[Dict] = None,
+        conversation_summary: Optional[str] = None,
+        conversation_history: Optional[List[Dict]] = None
+    ) -> AsyncIterator[str]:
+        """Provide academic assistance streamed chunk by chunk"""
+        messages = self._build_academic_messages(
+            task_description, branch, task_type, student_history, conversation_summary, conversation_history
+        )
+        async for chunk in self.chat_completion_stream(messages, temperature=0.7):
+            yield chunk
+    
+    def _build_academic_messages(
+        self, 
+        task_description: str,
+        branch: str,
+        task_type: str,
+        student_history: Optional[Dict] = None,
+        conversation_summary: Optional[str] = None,
+        conversation_history: Optional[List[Dict]] = None
+    ) -> List[Dict[str, str]]:
+        """Build the prompt messages for academic assistance
+        
+        Older turns of the task conversation arrive folded into conversation_summary;
+        only the recent raw turns are passed as conversation_history.
+        """
         history_context = ""
         if student_history:
-            weak_areas = ", ".join(student_history.get("weak_areas", []))
-            strong_areas = ", ".join(student_history.get("strong_areas", []))
-            history_context = f"\nStudent's weak areas: {weak_areas}\nStrong areas: {strong_areas}"
+            # Activities repeat the same areas a lot; dedupe before they hit the prompt
+            weak_areas = ", ".join(dict.fromkeys(student_history.get("weak_areas", [])))
+            strong_areas = ", ".join(dict.fromkeys(student_history.get("strong_areas", [])))
+            history_context = truncate_to_tokens(
+                f"\nStudent's weak areas: {weak_areas}\nStrong areas: {strong_areas}",
+                settings.llm_max_message_tokens // 4
+            )
         
         system_prompt = f"""You are an academic tutor helping a B-Tech {branch} student with their {task_type}.
 {history_context}
@@ -140,20 +419,53 @@ class AIService:
 Provide step-by-step guidance without giving direct answers. Focus on concept clarity and understanding.
 Be encouraging and supportive."""
         
+        if conversation_summary:
+            summary = truncate_to_tokens(conversation_summary, settings.llm_max_message_tokens // 2)
+            system_prompt += f"\n\nSummary of the earlier conversation on this task:\n{summary}"
+        
         # New SDK supports system instructions in config, but we can also use messages
+        return build_context(
+            system_prompt,
+            task_description,
+            history=conversation_history,
+            token_budget=settings.llm_context_token_budget,
+            max_message_tokens=settings.llm_max_message_tokens
+        )
+    
+    @instrumented
+    async def summarize_conversation(
+        self,
+        task_title: str,
+        turns: List[Dict],
+        previous_summary: Optional[str] = None
+    ) -> Optional[str]:
+        """Fold conversation turns (and any earlier summary) into a compact summary.
+        Returns None when the model is unavailable so callers keep the raw turns."""
+        transcript = "\n".join(
+            f"{turn.get('role', 'user')}: {truncate_to_tokens(str(turn.get('content', '')), 300)}"
+            for turn in turns
+        )
+        
+        system_prompt = f"""You maintain running notes of a tutoring conversation about the task "{task_title}".
+Merge the previous summary and the new turns into one concise summary (max 150 words).
+Keep what the student asked, what they already understood, open questions and hints already given.
+Write plain prose, no headings."""
+        
         messages = [
             {"role": "system", "content": system_prompt},
-            {"role": "user", "content": task_description}
+            {"role": "user", "content": f"Previous summary:\n{previous_summary or 'None'}\n\nNew turns:\n{transcript}"}
         ]
         
-        return await self.chat_completion(messages, temperature=0.7)
+        return await self.chat_completion(messages, temperature=0.3, max_tokens=300, allow_fallback=False)
     
+    @instrumented
     async def career_recommendation(
         self,
         branch: str,
         interests: List[str],
         career_goal: str,
-        skills_analysis: Optional[Dict] = None
+        skills_analysis: Optional[Dict] = None,
+        bypass_cache: bool = False
     ) -> Dict:
         """Generate career recommendations"""
         skills_context = ""
@@ -191,17 +503,21 @@ Provide 3-5 specific career path recommendations in JSON format:
             {"role": "user", "content": "Generate career recommendations for me."}
         ]
         
-        response = await self.chat_completion(messages, temperature=0.8, max_tokens=1000)
+        response = await self.chat_completion(
+            messages, temperature=0.8, max_tokens=1000,
+            cache_ttl=self.CACHE_TTL_SECONDS["career_recommendation"], bypass_cache=bypass_cache,
+            response_schema=CareerPathsOutput
+        )
         
-        # Parse JSON response
-        parsed_result = self._extract_json(response)
+        parsed = self._parse_structured(response, CareerPathsOutput)
         
         return {
-            "recommendations": parsed_result.get("paths", []),
-            "raw_text": response if "error" in parsed_result else None,
+            "recommendations": [path.model_dump() for path in parsed.paths] if parsed else [],
+            "raw_text": None if parsed else response,
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
     
+    @instrumented
     async def resume_content_generation(
         self,
         projects: List[Dict],
@@ -240,135 +556,96 @@ Provide 3-5 bullet points for each project."""
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
     
+    @instrumented
     async def ats_analysis(
         self,
         resume_text: str,
         job_description: Optional[str] = None
     ) -> Dict:
         """Analyze resume for ATS compatibility"""
+        return await self._scored_ats_analysis(resume_text, None, job_description)
+    
+    async def _scored_ats_analysis(
+        self,
+        resume_text: str,
+        target_domain: Optional[Dict],
+        job_description: Optional[str]
+    ) -> Dict:
+        """Score a resume locally (see ats_scorer) and ask the LLM only for suggestions"""
+        # Re-uploads of the same resume for the same job reuse the previous analysis
+        use_cache = settings.ai_cache_enabled
+        domain_key = target_domain.get("domain_id", target_domain.get("title", "")) if target_domain else ""
+        cache_key = content_hash(resume_text, job_description or "", domain_key)
+        if use_cache:
+            cached = self.ats_cache.get(cache_key)
+            CACHE_LOOKUPS.inc(current_method(), "result", "hit" if cached is not None else "miss")
+            if cached is not None:
+                return json.loads(cached)
+        
+        report = get_ats_scorer().score(resume_text, target_domain, job_description)
+        suggestions = await self._ats_suggestions(resume_text, report, job_description)
+        
+        result = {
+            **report,
+            "suggestions": suggestions or local_suggestions(report),
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+        if suggestions is None:
+            FALLBACKS.inc(current_method(), "local_rules")
+        elif use_cache:
+            self.ats_cache.set(cache_key, json.dumps(result), settings.ats_cache_ttl_seconds)
+        return result
+    
+    async def _ats_suggestions(
+        self,
+        resume_text: str,
+        report: Dict,
+        job_description: Optional[str]
+    ) -> Optional[List[str]]:
+        """Improvement suggestions for a scored resume, or None if the LLM is unavailable"""
+        details = report["match_details"]
         jd_context = ""
         if job_description:
-            jd_context = f"\n\nTarget Job Description:\n{job_description}"
+            jd_context = f"\n\nTarget Job Description:\n{truncate_to_tokens(job_description, settings.llm_max_message_tokens // 2)}"
         
-        system_prompt = f"""You are an ATS (Applicant Tracking System) analyzer.
+        system_prompt = f"""You are an ATS (Applicant Tracking System) resume reviewer for {details['target_domain']} roles.
 
-Analyze this resume for ATS compatibility:
-{resume_text}
+Keyword scan result: {report['ats_score']}/100
+Keywords found: {', '.join(report['keywords_found']) or 'None'}
+Keywords missing: {', '.join(report['keywords_missing']) or 'None'}
+Skills not evidenced: {', '.join(details['skills_missing']) or 'None'}
+Sections missing: {', '.join(details['sections_missing']) or 'None'}
+
+Resume:
+{truncate_to_tokens(resume_text, settings.llm_max_message_tokens)}
 {jd_context}
 
-Provide:
-1. ATS score (0-100)
-2. Key missing keywords
-3. Specific suggestions for improvement
+Give 3-5 specific suggestions to improve this resume for ATS and recruiters.
+Do not suggest claiming skills the student does not have.
 
 Format as JSON:
 {{
-  "ats_score": 75,
-  "keywords_found": ["keyword1", "keyword2"],
-  "keywords_missing": ["keyword3", "keyword4"],
   "suggestions": ["suggestion1", "suggestion2"]
 }}"""
         
         messages = [
             {"role": "system", "content": system_prompt},
-            {"role": "user", "content": "Analyze my resume."}
+            {"role": "user", "content": "How can I improve my resume?"}
         ]
         
-        response = await self.chat_completion(messages, temperature=0.5, max_tokens=600)
-        
-        parsed_result = self._extract_json(response)
-        
-        # Ensure correct types for Pydantic validation
-        try:
-            ats_score = int(parsed_result.get("ats_score", 0))
-        except (ValueError, TypeError):
-            ats_score = 0
-
-        return {
-            "ats_score": ats_score,
-            "keywords_found": parsed_result.get("keywords_found") if isinstance(parsed_result.get("keywords_found"), list) else [],
-            "keywords_missing": parsed_result.get("keywords_missing") if isinstance(parsed_result.get("keywords_missing"), list) else [],
-            "suggestions": parsed_result.get("suggestions") if isinstance(parsed_result.get("suggestions"), list) else [],
-            "match_details": parsed_result.get("match_details", {}),
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
+        response = await self.chat_completion(
+            messages, temperature=0.5, max_tokens=400, cache_ttl=settings.ats_cache_ttl_seconds,
+            allow_fallback=False, response_schema=ATSSuggestionsOutput
+        )
+        parsed = self._parse_structured(response, ATSSuggestionsOutput)
+        return parsed.suggestions if parsed and parsed.suggestions else None
     
     def _get_fallback_response(self, user_message: str) -> str:
         """Generate intelligent fallback responses when AI API is unavailable"""
-        message_lower = user_message.lower()
-        
-        # Academic help patterns
-        if any(word in message_lower for word in ['study', 'learn', 'understand', 'subject', 'exam', 'test', 'assignment', 'homework']):
-            responses = [
-                "Great question! When studying, I recommend the Feynman Technique: try explaining the concept in simple words as if teaching someone else. This helps identify gaps in your understanding. Also, break your study sessions into 25-minute focused blocks with 5-minute breaks (Pomodoro Technique). Would you like specific tips for any particular subject?",
-                "Studying effectively is all about active recall and spaced repetition. Instead of just re-reading notes, try testing yourself frequently. Create flashcards, solve practice problems, and explain concepts aloud. Also, don't cram - spread your study sessions over days or weeks. What subject are you working on?",
-                "Focus on understanding concepts rather than memorizing. Use multiple resources - videos, articles, practice problems. Study in a distraction-free environment, and teach what you learn to others. This reinforces your own understanding. Need help with a specific topic?"
-            ]
-            return random.choice(responses)
-        
-        # Motivation patterns
-        elif any(word in message_lower for word in ['motivate', 'inspire', 'give up', 'fail', 'difficult', 'hard', 'cant', "can't", 'stressed', 'overwhelmed']):
-            responses = [
-                "I understand it feels overwhelming right now, but remember - every expert was once a beginner. Your struggles today are building the skills you'll use tomorrow. Break your goals into smaller, achievable tasks. Celebrate small wins. You're capable of more than you think! 💪",
-                "Tough times don't last, but tough students do! It's okay to feel challenged - that's how we grow. Remember why you started this journey. Take breaks when needed, but don't give up. Every great engineer faced difficulties. What matters is persistence. You've got this!",
-                "Feeling stuck is part of the learning process. Instead of saying 'I can't do this,' try 'I can't do this YET.' Every mistake is a lesson. Take a deep breath, break the problem into smaller parts, and tackle one piece at a time. Progress, not perfection!"
-            ]
-            return random.choice(responses)
-        
-        # Career/future patterns
-        elif any(word in message_lower for word in ['career', 'job', 'future', 'work', 'placement', 'interview', 'company', 'salary']):
-            responses = [
-                "Great that you're thinking ahead! Focus on building strong fundamentals in your branch subjects first. Then, identify your interests and work on relevant projects. Contribute to open source, build a portfolio, and network with professionals. Internships are crucial - they give real-world experience. What field interests you most?",
-                "Career success comes from continuous learning and practical experience. Start by identifying your strengths and interests. Work on projects that showcase your skills. Learn in-demand technologies. Practice coding/problem-solving regularly. Attend hackathons and workshops. Remember, your first job is just the beginning of a long journey!",
-                "Planning your career is smart! Build technical skills through projects, contribute to GitHub, create a strong LinkedIn profile. Practice for technical interviews regularly. Soft skills matter too - communication, teamwork, problem-solving. Consider what type of work excites you and align your learning accordingly."
-            ]
-            return random.choice(responses)
-        
-        # Productivity/time management patterns
-        elif any(word in message_lower for word in ['productive', 'time', 'manage', 'focus', 'concentrate', 'procrastinate', 'distract']):
-            responses = [
-                "Great question! Try the Pomodoro Technique: work in focused 25-minute sessions with 5-minute breaks. Use apps to block distracting websites during study time. Create a dedicated study space. Plan your day the night before. Prioritize tasks using the Eisenhower Matrix (urgent vs important). Most importantly, be consistent!",
-                "Productivity tips that work: 1) Start with your hardest task (eat the frog). 2) Use time-blocking - assign specific hours to specific tasks. 3) Minimize multitasking. 4) Keep your phone away during study. 5) Take regular breaks. 6) Get enough sleep - tired minds aren't productive!",
-                "Managing time effectively is a skill you can develop. Create a weekly schedule with dedicated study blocks. Use the 2-minute rule - if something takes less than 2 minutes, do it now. Batch similar tasks together. Track how you spend time for a week to identify time-wasters. Remember: discipline beats motivation!"
-            ]
-            return random.choice(responses)
-        
-        # Skills/learning patterns  
-        elif any(word in message_lower for word in ['skill', 'learn','course', 'tutorial', 'practice', 'improve', 'better']):
-            responses = [
-                "Building skills requires consistent practice! Focus on project-based learning - it's more effective than just watching tutorials. Start with fundamentals, then build real projects. Use platforms like GitHub to showcase your work. Learn by teaching others. Set specific, measurable goals. What skill are you working on?",
-                "Great that you want to improve! Here's my advice: 1) Learn by doing - build projects, not just tutorials. 2) Join coding communities. 3) Read documentation and source code. 4) Practice daily, even if just 30 minutes. 5) Get feedback on your work. 6) Don't try to learn everything - go deep in a few areas first.",
-                "Skill development is a journey! Start with free resources like NPTEL, Coursera, and YouTube. But don't just consume - create! Build projects that solve real problems. Contribute to open source. Participate in hackathons. Learn from failures. The best learning happens when you're building something challenging."
-            ]
-            return random.choice(responses)
-        
-        # General greeting patterns
-        elif any(word in message_lower for word in ['hi', 'hello', 'hey', 'greetings']):
-            responses = [
-                "Hello! I'm here to help you with your academic journey, career planning, motivation, or any challenges you're facing. What's on your mind today?",
-                "Hey there! Great to see you! Whether you need study tips, career advice, motivation, or just someone to talk to, I'm here. How can I support you today?",
-                "Hi! Welcome! I'm your AI mentor, ready to help with academics, career guidance, productivity tips, or anything else you need. What would you like to discuss?"
-            ]
-            return random.choice(responses)
-        
-        # Thank you patterns
-        elif any(word in message_lower for word in ['thank', 'thanks', 'appreciate']):
-            responses = [
-                "You're very welcome! I'm always here to help. Keep up the great work, and don't hesitate to reach out anytime you need guidance or support!",
-                "Happy to help! Remember, asking questions and seeking guidance is a sign of strength, not weakness. Keep pushing forward - you're doing great!",
-                "My pleasure! Your success is what matters. Keep learning, keep growing, and keep believing in yourself. I'm here whenever you need me!"
-            ]
-            return random.choice(responses)
-        
-        # Default response
-        else:
-            responses = [
-                "That's an interesting question! As a B-Tech student, remember that challenges are opportunities to grow. Whether it's about academics, career planning, or personal development, I'm here to guide you. Could you tell me more about what you're working on or struggling with?",
-                "I'm here to support you! Whether you need help with studying, career planning, managing stress, or improving productivity, feel free to ask. What specific aspect would you like to discuss?",
-                "Thanks for sharing! My goal is to help you succeed in your engineering journey. I can assist with academic guidance, career advice, motivation, study strategies, and more. What would be most helpful for you right now?"
-            ]
-            return random.choice(responses)
+        intent = self.intent_matcher.match(user_message)
+        return random.choice(intent["responses"])
     
+    @instrumented
     async def mentor_chat(
         self,
         user_message: str,
@@ -376,7 +653,33 @@ Format as JSON:
     ) -> str:
         """AI mentor chat using Gemini"""
         try:
-            system_prompt = """You are a friendly and supportive AI mentor for B-Tech students.
+            messages = self._build_mentor_messages(user_message, conversation_history)
+            return await self.chat_completion(messages, temperature=0.8)
+        except LLMQueueFullError:
+            raise
+        except Exception as e:
+            print(f"Mentor chat error: {e}")
+            FALLBACKS.inc(current_method(), "error")
+            return self._get_fallback_response(user_message)
+    
+    @instrumented
+    async def mentor_chat_stream(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict]] = None
+    ) -> AsyncIterator[str]:
+        """AI mentor chat streamed token by token"""
+        messages = self._build_mentor_messages(user_message, conversation_history)
+        async for chunk in self.chat_completion_stream(messages, temperature=0.8):
+            yield chunk
+    
+    def _build_mentor_messages(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict]] = None
+    ) -> List[Dict[str, str]]:
+        """Build the prompt messages for a mentor conversation turn"""
+        system_prompt = """You are a friendly and supportive AI mentor for B-Tech students.
 You provide:
 - Academic guidance and study tips
 - Motivation and encouragement
@@ -385,72 +688,86 @@ You provide:
 - Productivity tips
 
 Be warm, understanding, and encouraging. Keep responses concise but helpful (2-3 paragraphs max)."""
-            
-            messages = [{"role": "system", "content": system_prompt}]
-            
-            if conversation_history:
-                messages.extend(conversation_history[-5:])  # Last 5 messages for context
-            
-            messages.append({"role": "user", "content": user_message})
-            
-            return await self.chat_completion(messages, temperature=0.8)
-        except Exception as e:
-            print(f"Mentor chat error: {e}")
-            return self._get_fallback_response(user_message)
+        
+        # Newest history first, as much as fits in the token budget
+        return build_context(
+            system_prompt,
+            user_message,
+            history=conversation_history,
+            token_budget=settings.llm_context_token_budget,
+            max_message_tokens=settings.llm_max_message_tokens
+        )
     
+    @instrumented
     async def generate_motivation(self) -> str:
-        """Generate motivational message using Gemini"""
-        try:
-            if self.client and settings.gemini_api_key:
-                system_prompt = """You are a motivational coach for engineering students.
-Generate a short, impactful motivational message (2-3 sentences) to inspire students.
-Focus on perseverance, growth, and achievement."""
-                
-                messages = [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": "Give me a motivational message."}
-                ]
-                
-                return await self.chat_completion(messages, temperature=0.9, max_tokens=150)
-            else:
-                # Fallback motivational quotes if client is not initialized
-                quotes = [
-                    "Success is not final, failure is not fatal: it is the courage to continue that counts.",
-                    "The difference between who you are and who you want to be is what you do.",
-                    "Engineering is not about having all the answers - it's about having the persistence to find them."
-                ]
-                return random.choice(quotes)
-
-        except Exception as e:
-            print(f"Motivation generation error: {e}")
-            return "Believe in yourself and your abilities. Every challenge you face is making you stronger and more capable. Keep pushing forward!"
+        """Motivational message from the pre-generated pool (no upstream call)"""
+        return self.motivation_pool.next()
     
+    @instrumented
+    async def generate_motivation_batch(self, count: int) -> Optional[List[str]]:
+        """Generate a batch of motivational messages for the pool, or None if unavailable"""
+        if not self.provider:
+            return None
+        system_prompt = f"""You are a motivational coach for engineering students.
+Generate {count} different short, impactful motivational messages (2-3 sentences each) to inspire students.
+Focus on perseverance, growth, and achievement.
+Return JSON: {{"messages": ["..."]}}"""
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": "Give me motivational messages."}
+        ]
+        
+        # Background refill: queue behind request traffic and never store canned fallbacks
+        with llm_caller(LLMPriority.BULK, "motivation_pool"):
+            response = await self.chat_completion(
+                messages, temperature=0.9, max_tokens=120 * count,
+                allow_fallback=False, response_schema=MotivationBatchOutput
+            )
+        parsed = self._parse_structured(response, MotivationBatchOutput)
+        return parsed.messages if parsed else None
+    
+    @instrumented
     async def detailed_career_matching(
         self,
         student_context: str,
-        available_domains: List[Dict]
+        available_domains: List[Dict],
+        bypass_cache: bool = False,
+        student_profile: Optional[Dict] = None
     ) -> Dict:
         """
         Match student profile to career domains with detailed reasoning
         Returns top 5 matching domains with match scores
+        
+        The local matcher ranks every domain first; only the top candidates go into
+        the prompt, and the same ranking is the answer when the LLM is unavailable.
+        student_profile may carry branch, interests, skills and career_goal; without
+        it the free-text student_context is used for ranking.
         """
-        # Limit to representative domains to avoid token limits
-        domain_summaries = []
-        for domain in available_domains[:20]:  # Limit sample
-            domain_summaries.append({
-                "id": domain['domain_id'],
-                "title": domain['title'],
-                "category": domain['category'],
-                "key_skills": [s['name'] for s in domain['key_skills'][:5]],
-                "description": domain['description'][:150]
-            })
+        matcher = get_matcher(available_domains)
+        if student_profile:
+            ranked = matcher.rank(top_k=settings.career_match_top_k, **student_profile)
+        else:
+            ranked = matcher.rank(top_k=settings.career_match_top_k, extra_text=student_context)
+        
+        domain_summaries = [
+            {
+                "id": entry["domain"]['domain_id'],
+                "title": entry["domain"]['title'],
+                "category": entry["domain"]['category'],
+                "key_skills": [s['name'] for s in entry["domain"]['key_skills'][:5]],
+                "description": entry["domain"]['description'][:150],
+                "local_score": entry["match_score"]
+            }
+            for entry in ranked
+        ]
         
         system_prompt = f"""You are an expert career counselor for engineering students.
 
 {student_context}
 
-Available career domains:
-{domain_summaries}
+Candidate career domains (pre-ranked by profile similarity, local_score 0-100):
+{json.dumps(domain_summaries, ensure_ascii=False)}
 
 Analyze the student's profile and recommend the top 5 best-matching career domains.
 For each recommendation, provide:
@@ -476,33 +793,25 @@ Return as JSON:
             {"role": "user", "content": "Analyze my profile and recommend career paths."}
         ]
         
-        response = await self.chat_completion(messages, temperature=0.7, max_tokens=800)
+        response = await self.chat_completion(
+            messages, temperature=0.7, max_tokens=800,
+            cache_ttl=self.CACHE_TTL_SECONDS["detailed_career_matching"], bypass_cache=bypass_cache,
+            response_schema=CareerMatchesOutput
+        )
         
-        # Parse JSON response
-        parsed_result = self._extract_json(response)
-        
-        # Ensure matches key exists and is a list
-        if "matches" not in parsed_result or not isinstance(parsed_result["matches"], list):
-            # Fallback for Demo Mode or API Failure
-            print("AI Service: Using fallback mode for career recommendations")
-            
-            # Select 3 random domains
-            selected_domains = random.sample(available_domains, min(3, len(available_domains)))
-            matches = []
-            
-            for domain in selected_domains:
-                matches.append({
-                    "domain_id": domain['domain_id'],
-                    "domain_title": domain['title'],
-                    "match_score": random.randint(75, 95),
-                    "reasoning": f"Based on your profile, {domain['title']} is a strong match due to alignment with engineering fundamentals.",
-                    "next_step": "Explore the industry roadmap for this domain."
-                })
+        parsed = self._parse_structured(response, CareerMatchesOutput)
+        if parsed:
+            parsed_result = {"matches": [match.model_dump() for match in parsed.matches]}
+        else:
+            # Fallback for Demo Mode or API Failure: serve the local ranking
+            print("AI Service: Using local matcher for career recommendations")
+            matches = matcher.to_matches(ranked[:5])
             
             parsed_result = {"matches": matches}
              
         return parsed_result
     
+    @instrumented
     async def ats_analysis_with_domain(
         self,
         resume_text: str,
@@ -512,61 +821,23 @@ Return as JSON:
         """
         Analyze resume for ATS compatibility with domain-specific keyword checking
         """
-        domain_keywords = target_domain.get('keywords_for_ats', [])
-        domain_skills = [s['name'] for s in target_domain.get('key_skills', [])]
-        
-        jd_context = ""
-        if job_description:
-            jd_context = f"\n\nTarget Job Description:\n{job_description}"
-        
-        system_prompt = f"""You are an ATS (Applicant Tracking System) analyzer for {target_domain['title']} roles.
-
-Domain-Critical Keywords: {', '.join(domain_keywords)}
-Required Skills: {', '.join(domain_skills)}
-
-Analyze this resume:
-{resume_text}
-{jd_context}
-
-Provide:
-1. ATS score (0-100) based on keyword presence
-2. Keywords found vs. missing (from domain-critical list)
-3. Specific suggestions to improve ATS score
-
-Format as JSON:
-{{
-  "ats_score": 75,
-  "keywords_found": ["keyword1", "keyword2"],
-  "keywords_missing": ["keyword3", "keyword4"],
-  "suggestions": ["suggestion1", "suggestion2"],
-  "domain_match": "How well resume targets this domain"
-}}"""
-        
-        response = await self.chat_completion(messages, temperature=0.5, max_tokens=600)
-        
-        parsed_result = self._extract_json(response)
-
-        
-        try:
-            ats_score = int(parsed_result.get("ats_score", 0))
-        except (ValueError, TypeError):
-            ats_score = 0
-
-        return {
-            "ats_score": ats_score,
-            "keywords_found": parsed_result.get("keywords_found") if isinstance(parsed_result.get("keywords_found"), list) else [],
-            "keywords_missing": parsed_result.get("keywords_missing") if isinstance(parsed_result.get("keywords_missing"), list) else [],
-            "suggestions": parsed_result.get("suggestions") if isinstance(parsed_result.get("suggestions"), list) else [],
-            "domain_match": parsed_result.get("domain_match", "Good potential"),
-            "target_domain": target_domain['title'],
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
+        result = await self._scored_ats_analysis(resume_text, target_domain, job_description)
+        score = result["ats_score"]
+        if score >= 75:
+            domain_match = f"Strong fit for {target_domain['title']} roles"
+        elif score >= 50:
+            domain_match = "Good potential"
+        else:
+            domain_match = f"Needs more {target_domain['title']} keywords and evidence"
+        return {**result, "domain_match": domain_match, "target_domain": target_domain['title']}
     
+    @instrumented
     async def generate_skill_roadmap(
         self,
         target_domain: Dict,
         current_skills: List[str],
-        timeline_months: int = 12
+        timeline_months: int = 12,
+        bypass_cache: bool = False
     ) -> Dict:
         """
         Generate personalized learning roadmap for target domain
@@ -588,25 +859,58 @@ Create a month-by-month learning plan with:
 - Recommended resources (courses, books, projects)
 - Milestones to achieve
 
-Be specific and actionable. Format as structured text."""
+Be specific and actionable. Keep each entry short.
+Return JSON: {{"months": [{{"month": 1, "focus": "...", "topics": ["..."], "resources": ["..."], "milestones": ["..."]}}]}}"""
         
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": f"Create a {timeline_months}-month roadmap for me."}
         ]
         
-        response = await self.chat_completion(messages, temperature=0.7, max_tokens=1000)
+        # Each month carries focus, topics, resources and milestones (~150 tokens as JSON)
+        response = await self.chat_completion(
+            messages, temperature=0.7, max_tokens=400 + 150 * timeline_months,
+            cache_ttl=self.CACHE_TTL_SECONDS["generate_skill_roadmap"], bypass_cache=bypass_cache,
+            response_schema=SkillRoadmapOutput
+        )
+        
+        parsed = self._parse_structured(response, SkillRoadmapOutput)
+        if parsed:
+            roadmap = self._format_roadmap(parsed)
+        elif response and not response.lstrip().startswith(("{", "[", "```")):
+            # Plain-text fallback answers are readable as they are
+            roadmap = response
+        else:
+            # Truncated or invalid JSON is not something to show a student
+            roadmap = "We couldn't generate your roadmap right now. Please try again in a few minutes."
         
         return {
-            "roadmap": response,
+            "roadmap": roadmap,
+            "months": [month.model_dump() for month in parsed.months] if parsed else [],
             "domain": target_domain['title'],
             "duration_months": timeline_months
         }
     
+    def _format_roadmap(self, roadmap: SkillRoadmapOutput) -> str:
+        """Render a structured roadmap as readable text"""
+        sections = []
+        for month in roadmap.months:
+            lines = [f"Month {month.month}: {month.focus}"]
+            if month.topics:
+                lines.append("  Learn: " + ", ".join(month.topics))
+            if month.resources:
+                lines.append("  Resources: " + ", ".join(month.resources))
+            if month.milestones:
+                lines.append("  Milestones: " + ", ".join(month.milestones))
+            sections.append("\n".join(lines))
+        return "\n\n".join(sections)
+    
+    @instrumented
     async def interview_preparation(
         self,
         target_domain: Dict,
-        experience_level: str = "fresher"
+        experience_level: str = "fresher",
+        bypass_cache: bool = False
     ) -> Dict:
         """
         Generate domain-specific interview preparation guidance
@@ -630,7 +934,10 @@ Keep it concise and actionable."""
             {"role": "user", "content": "Help me prepare for interviews."}
         ]
         
-        response = await self.chat_completion(messages, temperature=0.7, max_tokens=800)
+        response = await self.chat_completion(
+            messages, temperature=0.7, max_tokens=800,
+            cache_ttl=self.CACHE_TTL_SECONDS["interview_preparation"], bypass_cache=bypass_cache
+        )
         
         return {
             "preparation_guide": response,
@@ -638,6 +945,7 @@ Keep it concise and actionable."""
             "level": experience_level
         }
 
+    @instrumented
     async def internship_review(
         self,
         internship_data: Dict,
@@ -683,3 +991,22 @@ Keep it concise and actionable."""
 # Singleton instance
 ai_service = AIService()
 
+
+registry.register(Gauge(
+    "ai_cache_hit_ratio", "Response cache hit ratio since startup", ("tier",),
+    lambda: [(("local",), ai_service.response_cache.stats()["hit_ratio"]),
+             (("shared",), ai_service.shared_cache.stats()["hit_ratio"])]
+))
+registry.register(Gauge(
+    "ai_llm_in_flight", "LLM calls currently running", (),
+    lambda: [((), ai_service.scheduler.in_flight)]
+))
+registry.register(Gauge(
+    "ai_llm_queue_depth", "LLM calls waiting for a slot", ("priority",),
+    lambda: [((p,), d) for p, d in ai_service.scheduler.stats()["queue_depth_by_priority"].items()]
+))
+registry.register(Gauge(
+    "ai_circuit_breaker_state", "Current LLM circuit breaker state (1 for the active state)", ("state",),
+    lambda: [((state,), int(ai_service.breaker.state == state)) for state in ("closed", "open", "half_open")]
+))
+
@@ -0,0 +1,222 @@
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..data import get_all_domains
+from .career_matcher import TOKEN_PATTERN, get_matcher
+
+# Alternative spellings, keyed by the normalized (lowercase, space separated) keyword
+SYNONYMS = {
+    "javascript": ["js", "ecmascript"],
+    "node js": ["node"],
+    "postgresql": ["postgres"],
+    "mongodb": ["mongo"],
+    "sql": ["postgresql", "postgres", "mysql", "sqlite", "oracle"],
+    "nosql databases": ["nosql", "mongodb", "cassandra", "redis", "dynamodb"],
+    "api": ["rest", "restful", "graphql"],
+    "git": ["github", "gitlab"],
+    "aws": ["amazon web services"],
+    "kubernetes": ["k8s"],
+    "ci cd": ["continuous integration", "github actions", "jenkins"],
+    "machine learning": ["ml"],
+    "deep learning": ["neural network"],
+    "llm": ["large language model"],
+    "nlp": ["natural language processing"],
+    "cnns": ["cnn", "convolutional neural network"],
+    "rag": ["retrieval augmented generation"],
+    "vector db": ["vector database", "pinecone", "weaviate", "faiss", "chromadb"],
+    "hugging face": ["huggingface"],
+    "fine tuning": ["finetuning", "lora"],
+    "scikit learn": ["sklearn"],
+    "powerbi": ["power bi"],
+    "visualization": ["visualisation", "matplotlib", "seaborn"],
+    "data analysis": ["data analytics"],
+    "dsa": ["data structures", "algorithms"],
+    "computer networks": ["networking"],
+    "cybersecurity": ["cyber security", "information security"],
+    "mfa": ["multi factor authentication", "2fa"],
+    "autocad": ["auto cad"],
+    "solidworks": ["solid works"],
+    "cad": ["autocad", "solidworks", "catia"],
+    "fea": ["finite element"],
+    "cfd": ["computational fluid dynamics"],
+    "dsp": ["digital signal processing"],
+    "plc": ["programmable logic controller"],
+    "ai": ["artificial intelligence"]
+}
+
+# Resume sections ATS parsers look for, with the words that mark them
+SECTIONS = {
+    "education": ["education", "academic", "qualification"],
+    "experience": ["experience", "internship", "employment", "work history"],
+    "projects": ["project"],
+    "skills": ["skill", "technical skill", "technologies"]
+}
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+
+# Share of the score from domain/JD keywords, key skills and resume structure
+KEYWORD_WEIGHT = 60
+SKILL_WEIGHT = 25
+STRUCTURE_WEIGHT = 15
+
+Phrase = Tuple[str, ...]
+CompiledTerm = Tuple[str, List[Phrase]]  # (display label, accepted token sequences)
+
+
+def _stem(token: str) -> str:
+    """Crude plural folding so "APIs" matches "API" and "Transformers" matches "Transformer" """
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def normalize(text: str) -> Phrase:
+    """Lowercase tokens with punctuation dropped and plurals folded ("Node.js" -> ("node", "js"))"""
+    return tuple(_stem(t) for t in TOKEN_PATTERN.findall(text.lower()))
+
+
+def _forms(phrase: str) -> Set[Phrase]:
+    raw = TOKEN_PATTERN.findall(phrase.lower())
+    if not raw:
+        return set()
+    forms = {tuple(_stem(t) for t in raw)}
+    if len(raw) > 1:
+        # "Node.js" is also written "nodejs", "CI/CD" as "cicd"
+        forms.add((_stem("".join(raw)),))
+    for synonym in SYNONYMS.get(" ".join(raw), []):
+        forms.add(normalize(synonym))
+    return {form for form in forms if form}
+
+
+def compile_keyword(keyword: str) -> CompiledTerm:
+    return keyword, sorted(_forms(keyword))
+
+
+def compile_skill(name: str) -> CompiledTerm:
+    """Skill names list alternatives: "React/Vue/Angular", "RAG (Retrieval-Augmented Generation)" """
+    main, _, detail = name.partition("(")
+    forms: Set[Phrase] = set()
+    for part in re.split(r"[/,]", main) + re.split(r"[/,]", detail.rstrip(") ")):
+        forms |= _forms(part)
+    return name.strip(), sorted(forms)
+
+
+class ResumeIndex:
+    """Token n-grams of a resume, built once and probed per keyword"""
+
+    def __init__(self, text: str, max_n: int = 4):
+        tokens = normalize(text)
+        self.grams: Set[Phrase] = set()
+        for n in range(1, max_n + 1):
+            for i in range(len(tokens) - n + 1):
+                self.grams.add(tokens[i:i + n])
+        self.has_email = bool(EMAIL_PATTERN.search(text))
+
+    def contains(self, term: CompiledTerm) -> bool:
+        return any(form in self.grams for form in term[1])
+
+
+class ATSScorer:
+    """Deterministic ATS keyword scorer over the career domain keyword lists.
+
+    Each domain's keywords_for_ats and key_skills are compiled once into token
+    phrases with synonyms; a resume is tokenized once into n-grams and every
+    keyword check is a set lookup.
+    """
+
+    def __init__(self, domains: List[Dict]):
+        self._compiled: Dict[str, Tuple[List[CompiledTerm], List[CompiledTerm]]] = {}
+        vocabulary: Dict[str, CompiledTerm] = {}
+        for domain in domains:
+            keywords, _ = self._domain_terms(domain)
+            for term in keywords:
+                vocabulary.setdefault(term[0].lower(), term)
+        # Every known ATS keyword, used to pick keywords out of a job description
+        self.vocabulary = list(vocabulary.values())
+        self._sections = {name: [form for word in words for form in _forms(word)] for name, words in SECTIONS.items()}
+
+    def _domain_terms(self, domain: Dict) -> Tuple[List[CompiledTerm], List[CompiledTerm]]:
+        key = domain.get("domain_id") or domain.get("title", "")
+        if key not in self._compiled:
+            self._compiled[key] = (
+                [compile_keyword(k) for k in domain.get("keywords_for_ats", [])],
+                [compile_skill(s["name"]) for s in domain.get("key_skills", [])]
+            )
+        return self._compiled[key]
+
+    def keywords_in(self, text: str) -> List[CompiledTerm]:
+        """Known ATS keywords mentioned in text (e.g. a job description)"""
+        index = ResumeIndex(text)
+        return [term for term in self.vocabulary if index.contains(term)]
+
+    def score(
+        self,
+        resume_text: str,
+        domain: Optional[Dict] = None,
+        job_description: Optional[str] = None
+    ) -> Dict:
+        """Score a resume against a domain (the best-matching one if not given) and job description"""
+        if domain is None:
+            domain = get_matcher().rank(top_k=1, extra_text=f"{resume_text} {job_description or ''}")[0]["domain"]
+        keywords, skills = self._domain_terms(domain)
+        jd_terms = self.keywords_in(job_description) if job_description else []
+        seen = {term[0].lower() for term in keywords}
+        keywords = keywords + [term for term in jd_terms if term[0].lower() not in seen]
+
+        index = ResumeIndex(resume_text)
+        found = [term[0] for term in keywords if index.contains(term)]
+        missing = [term[0] for term in keywords if not index.contains(term)]
+        skills_found = [term[0] for term in skills if index.contains(term)]
+        skills_missing = [term[0] for term in skills if not index.contains(term)]
+        sections_found = [name for name, forms in self._sections.items() if any(f in index.grams for f in forms)]
+        if index.has_email:
+            sections_found.append("contact")
+        sections_missing = [name for name in [*SECTIONS, "contact"] if name not in sections_found]
+
+        keyword_coverage = len(found) / len(keywords) if keywords else 0.0
+        skill_coverage = len(skills_found) / len(skills) if skills else keyword_coverage
+        structure = len(sections_found) / (len(SECTIONS) + 1)
+        score = KEYWORD_WEIGHT * keyword_coverage + SKILL_WEIGHT * skill_coverage + STRUCTURE_WEIGHT * structure
+
+        return {
+            "ats_score": int(round(score)),
+            "keywords_found": found,
+            "keywords_missing": missing,
+            "match_details": {
+                "target_domain": domain.get("title"),
+                "keyword_coverage": round(keyword_coverage * 100),
+                "skill_coverage": round(skill_coverage * 100),
+                "skills_found": skills_found,
+                "skills_missing": skills_missing,
+                "job_description_keywords": [term[0] for term in jd_terms],
+                "sections_found": sections_found,
+                "sections_missing": sections_missing
+            }
+        }
+
+
+def local_suggestions(report: Dict) -> List[str]:
+    """Rule-based suggestions from a score report, used when the LLM is unavailable"""
+    details = report["match_details"]
+    suggestions = []
+    if report["keywords_missing"]:
+        suggestions.append(f"Mention these keywords where they honestly apply: {', '.join(report['keywords_missing'][:6])}.")
+    if details["skills_missing"]:
+        suggestions.append(f"Show evidence of {', '.join(details['skills_missing'][:3])} through projects or coursework.")
+    for section in details["sections_missing"]:
+        if section == "contact":
+            suggestions.append("Add an email address so recruiters and ATS parsers can find your contact details.")
+        else:
+            suggestions.append(f"Add a clearly titled '{section.title()}' section.")
+    suggestions.append("Quantify achievements with numbers (users served, accuracy gained, time saved).")
+    return suggestions
+
+
+_default_scorer: Optional[ATSScorer] = None
+
+
+def get_ats_scorer() -> ATSScorer:
+    """Scorer for the built-in CAREER_DOMAINS, compiled once and reused"""
+    global _default_scorer
+    if _default_scorer is None:
+        _default_scorer = ATSScorer(get_all_domains())
+    return _default_scorer
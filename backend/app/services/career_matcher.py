@@ -0,0 +1,175 @@
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..data import get_all_domains
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+STOPWORDS = {
+    "a", "an", "and", "the", "of", "in", "on", "for", "to", "with", "or", "by", "as", "at",
+    "is", "are", "be", "from", "into", "using", "preferred", "strong", "any", "etc", "not",
+    "b", "tech", "btech", "m", "first", "class", "months", "month",
+    # labels used in the free-text student context
+    "student", "profile", "branch", "interests", "cgpa", "completed", "tasks", "specified"
+}
+
+# Student profile values -> vocabulary used in the domain data
+BRANCH_TERMS = {
+    "cse": ["cs", "computer", "software", "programming"],
+    "it": ["it", "cs", "computer", "software"],
+    "ece": ["ece", "electronics", "telecommunication", "embedded", "signal"],
+    "eee": ["eee", "electrical", "electronics", "power"],
+    "me": ["mechanical", "design", "manufacturing"],
+    "mech": ["mechanical", "design", "manufacturing"],
+    "civil": ["civil", "construction", "structural"]
+}
+GOAL_TERMS = {
+    "govt": ["drdo", "scientist", "gate", "defense", "government"],
+    "higher studies": ["research", "ms", "phd"],
+    "job": []
+}
+
+# Feature weights per domain field
+FIELD_WEIGHTS = (
+    ("title", 3.0),
+    ("key_skills", 2.0),
+    ("keywords_for_ats", 2.0),
+    ("category", 1.5),
+    ("required_education", 1.0),
+    ("description", 1.0)
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed"""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _field_text(domain: Dict, field: str) -> str:
+    value = domain.get(field) or ""
+    if field == "key_skills":
+        return " ".join(skill["name"] for skill in value)
+    if isinstance(value, list):
+        return " ".join(value)
+    return str(value)
+
+
+class CareerDomainMatcher:
+    """Deterministic TF-IDF style scorer of career domains against a student profile.
+
+    Domains become rows of an L2-normalized domain x term matrix built once; a
+    profile is scored against every domain with a single matrix-vector product.
+    """
+
+    def __init__(self, domains: List[Dict]):
+        self.domains = list(domains)
+        self.domain_ids = [d["domain_id"] for d in self.domains]
+
+        rows = []
+        for domain in self.domains:
+            weights: Dict[str, float] = {}
+            for field, weight in FIELD_WEIGHTS:
+                for token in tokenize(_field_text(domain, field)):
+                    weights[token] = weights.get(token, 0.0) + weight
+            rows.append(weights)
+
+        self.vocabulary = {term: i for i, term in enumerate(sorted({t for row in rows for t in row}))}
+        self.terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        matrix = np.zeros((len(rows), len(self.vocabulary)), dtype=np.float32)
+        for i, row in enumerate(rows):
+            for term, weight in row.items():
+                matrix[i, self.vocabulary[term]] = weight
+
+        # Down-weight terms shared by many domains ("engineer", "design", ...)
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        self.idf = np.log((1 + len(rows)) / (1 + document_frequency)).astype(np.float32) + 1.0
+        matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = matrix / np.where(norms == 0, 1, norms)
+
+    def profile_vector(
+        self,
+        branch: Optional[str] = None,
+        interests: Optional[List[str]] = None,
+        skills: Optional[List[str]] = None,
+        career_goal: Optional[str] = None,
+        extra_text: str = ""
+    ) -> np.ndarray:
+        """Project a student profile onto the domain vocabulary"""
+        weighted_tokens = []
+        if branch:
+            branch_key = branch.strip().lower()
+            weighted_tokens += [(t, 1.0) for t in BRANCH_TERMS.get(branch_key, tokenize(branch))]
+        for interest in interests or []:
+            weighted_tokens += [(t, 2.0) for t in tokenize(interest)]
+        for skill in skills or []:
+            name = skill if isinstance(skill, str) else skill.get("name", "")
+            weighted_tokens += [(t, 1.5) for t in tokenize(name)]
+        if career_goal:
+            weighted_tokens += [(t, 1.0) for t in GOAL_TERMS.get(career_goal.strip().lower(), tokenize(career_goal))]
+        weighted_tokens += [(t, 1.0) for t in tokenize(extra_text)]
+
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for token, weight in weighted_tokens:
+            index = self.vocabulary.get(token)
+            if index is not None:
+                vector[index] += weight
+        vector *= self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def rank(self, top_k: Optional[int] = None, **profile) -> List[Dict]:
+        """Score every domain for a profile (see profile_vector), best first"""
+        vector = self.profile_vector(**profile)
+        scores = self.matrix @ vector
+        order = np.argsort(-scores, kind="stable")
+        if top_k:
+            order = order[:top_k]
+
+        top_score = float(scores[order[0]]) if len(order) else 0.0
+        ranked = []
+        for i in order:
+            score = float(scores[i])
+            contributions = self.matrix[i] * vector
+            matched = [self.terms[j] for j in np.argsort(-contributions)[:3] if contributions[j] > 0]
+            ranked.append({
+                "domain": self.domains[i],
+                "similarity": round(score, 4),
+                # Relative to the best domain so the top pick reads as a strong match
+                "match_score": int(round(50 + 45 * score / top_score)) if top_score > 0 else 50,
+                "matched_terms": matched
+            })
+        return ranked
+
+    def to_matches(self, ranked: List[Dict]) -> List[Dict]:
+        """Convert ranked domains to the detailed_career_matching response format"""
+        matches = []
+        for entry in ranked:
+            domain = entry["domain"]
+            if entry["matched_terms"]:
+                reasoning = f"Your profile lines up with {domain['title']} through: {', '.join(entry['matched_terms'])}."
+            else:
+                reasoning = f"{domain['title']} builds on general engineering fundamentals from your branch."
+            first_phase = (domain.get("roadmap_phases") or [{}])[0]
+            matches.append({
+                "domain_id": domain["domain_id"],
+                "domain_title": domain["title"],
+                "match_score": entry["match_score"],
+                "reasoning": reasoning,
+                "next_step": f"Start with: {first_phase['focus']}" if first_phase.get("focus") else "Explore the industry roadmap for this domain."
+            })
+        return matches
+
+
+_default_matcher: Optional[CareerDomainMatcher] = None
+
+
+def get_matcher(domains: Optional[List[Dict]] = None) -> CareerDomainMatcher:
+    """Matcher for the given domains; the built-in CAREER_DOMAINS matcher is built once and reused"""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = CareerDomainMatcher(get_all_domains())
+    if domains is None or [d["domain_id"] for d in domains] == _default_matcher.domain_ids:
+        return _default_matcher
+    return CareerDomainMatcher(domains)
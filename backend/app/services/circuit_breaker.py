@@ -0,0 +1,112 @@
+import time
+from typing import Dict, NamedTuple, Optional
+
+
+class Admission(NamedTuple):
+    """An allowed call; pass it back to record() with the outcome"""
+    probe_generation: Optional[int] = None  # set when admitted as a half-open probe
+
+
+class CircuitBreaker:
+    """Circuit breaker around the upstream LLM.
+
+    closed    -> calls flow; consecutive failures (errors, timeouts or calls slower
+                 than slow_call_seconds) beyond failure_threshold open the circuit
+    open      -> calls are rejected immediately until reset_timeout elapses
+    half_open -> up to half_open_max_calls probes run concurrently; success_threshold
+                 successful probes close the circuit, any failed probe re-opens it
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        slow_call_seconds: float = 10.0,
+        half_open_max_calls: int = 1,
+        success_threshold: int = 2
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.slow_call_seconds = slow_call_seconds
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.success_threshold = max(1, success_threshold)
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.half_open_successes = 0
+        self.half_open_in_flight = 0
+        self.half_open_generation = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected_calls = 0
+
+    def allow_request(self) -> Optional[Admission]:
+        """Admission for a call that may go upstream now, or None; every admission must be passed to record()"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected_calls += 1
+                return None
+            self.state = self.HALF_OPEN
+            self.half_open_successes = 0
+            self.half_open_in_flight = 0
+            self.half_open_generation += 1
+
+        if self.state == self.HALF_OPEN:
+            if self.half_open_in_flight >= self.half_open_max_calls:
+                self.rejected_calls += 1
+                return None
+            self.half_open_in_flight += 1
+            return Admission(self.half_open_generation)
+        return Admission()
+
+    def record(self, admission: Admission, success: bool, duration: float = 0.0):
+        """Record the outcome of an admitted call; slow successes count as failures"""
+        # Only probes admitted in the current half-open period use its slots and decide it;
+        # calls that started before the circuit opened finish as ordinary calls
+        was_probe = self.state == self.HALF_OPEN and admission.probe_generation == self.half_open_generation
+        if was_probe:
+            self.half_open_in_flight = max(0, self.half_open_in_flight - 1)
+        elif self.state == self.HALF_OPEN:
+            # A call from before the trip says nothing about whether upstream recovered
+            return
+
+        if success and duration > self.slow_call_seconds:
+            print(f"Warning: slow LLM call ({duration:.1f}s) counted as a breaker failure")
+            success = False
+
+        if success:
+            self.consecutive_failures = 0
+            if was_probe:
+                self.half_open_successes += 1
+                if self.half_open_successes >= self.success_threshold:
+                    self.state = self.CLOSED
+                    print("[INFO] LLM circuit breaker closed")
+            return
+
+        self.consecutive_failures += 1
+        if was_probe or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        if self.state != self.OPEN:
+            self.times_opened += 1
+            print(f"[!] LLM circuit breaker opened after {self.consecutive_failures} failures")
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict:
+        """Snapshot of breaker state for monitoring"""
+        retry_in = 0.0
+        if self.state == self.OPEN:
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected_calls,
+            "retry_in_seconds": round(retry_in, 1)
+        }
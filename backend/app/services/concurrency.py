@@ -0,0 +1,219 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+
+class LLMPriority(IntEnum):
+    """Scheduling classes for LLM calls; lower values are served first"""
+    INTERACTIVE = 0  # mentor chat
+    ASSIST = 1  # task assistance
+    BULK = 2  # resume/ATS analysis, recommendations, roadmaps, background jobs
+
+
+_llm_caller: ContextVar[Tuple[LLMPriority, str]] = ContextVar("llm_caller", default=(LLMPriority.BULK, "anonymous"))
+
+
+@contextmanager
+def llm_caller(priority: LLMPriority, user_id: Any = None):
+    """Run the enclosed LLM calls with this priority class on behalf of user_id"""
+    previous = _llm_caller.get()
+    token = _llm_caller.set((priority, str(user_id) if user_id is not None else "anonymous"))
+    try:
+        yield
+    finally:
+        try:
+            _llm_caller.reset(token)
+        except ValueError:
+            # Streaming generators can be finalized from another context
+            _llm_caller.set(previous)
+
+
+def current_llm_caller() -> Tuple[LLMPriority, str]:
+    return _llm_caller.get()
+
+
+class LLMQueueFullError(Exception):
+    """Raised when an LLM call is rejected because the scheduler queues are full"""
+
+    def __init__(self, priority: LLMPriority, retry_after: int):
+        super().__init__(f"LLM queue for {priority.name.lower()} calls is full")
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+class LLMScheduler:
+    """Caps in-flight LLM calls per worker and decides who gets the next free slot.
+
+    Waiting calls are served by priority class (interactive > assist > bulk) and,
+    within a class, round-robin across users so one user's burst cannot starve
+    others. Calls are rejected up front (LLMQueueFullError) when their class queue
+    or the user's own queue is already at its configured depth.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue_depth: Optional[Dict[LLMPriority, int]] = None,
+        max_queued_per_user: int = 4
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue_depth = max_queue_depth or {}
+        self.max_queued_per_user = max(1, max_queued_per_user)
+        # priority -> user -> waiting futures; user order is the round-robin order
+        self._queues: Dict[LLMPriority, "OrderedDict[str, Deque[asyncio.Future]]"] = {
+            priority: OrderedDict() for priority in LLMPriority
+        }
+        self._depth = {priority: 0 for priority in LLMPriority}
+        self._queued_by_user: Dict[str, int] = {}
+        self.in_flight = 0
+        self.peak_waiting = 0
+        self.total_calls = 0
+        self.rejected = {priority: 0 for priority in LLMPriority}
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.avg_call_seconds = 2.0  # moving average, seeds the Retry-After estimate
+
+    @property
+    def waiting(self) -> int:
+        return sum(self._depth.values())
+
+    def check_admission(self, priority: Optional[LLMPriority] = None, user_id: Optional[str] = None):
+        """Raise LLMQueueFullError if a call from this caller would be rejected now"""
+        if priority is None or user_id is None:
+            priority, user_id = current_llm_caller()
+        if self.in_flight < self.max_concurrent and not self.waiting:
+            return
+        depth_limit = self.max_queue_depth.get(priority)
+        if (depth_limit is not None and self._depth[priority] >= depth_limit) or \
+                self._queued_by_user.get(user_id, 0) >= self.max_queued_per_user:
+            self.rejected[priority] += 1
+            raise LLMQueueFullError(priority, self._retry_after(priority))
+
+    def _retry_after(self, priority: LLMPriority) -> int:
+        ahead = sum(self._depth[p] for p in LLMPriority if p <= priority)
+        estimate = self.avg_call_seconds * (ahead + 1) / self.max_concurrent
+        return int(min(60, max(1, math.ceil(estimate))))
+
+    @asynccontextmanager
+    async def slot(self):
+        """Wait for a free LLM slot for the current caller, yielding the time spent queued"""
+        priority, user_id = current_llm_caller()
+        start = time.perf_counter()
+        if self.in_flight < self.max_concurrent and not self.waiting:
+            self.in_flight += 1
+        else:
+            self.check_admission(priority, user_id)
+            future = asyncio.get_running_loop().create_future()
+            self._queues[priority].setdefault(user_id, deque()).append(future)
+            self._depth[priority] += 1
+            self._queued_by_user[user_id] = self._queued_by_user.get(user_id, 0) + 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+            try:
+                # A releasing call hands its slot over by resolving the future
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release()
+                else:
+                    self._dequeue(priority, user_id, future)
+                raise
+
+        waited = time.perf_counter() - start
+        self.total_calls += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        if waited > 1.0:
+            print(f"Warning: LLM call queued for {waited:.2f}s ({self.waiting} still waiting)")
+
+        started = time.perf_counter()
+        try:
+            yield waited
+        finally:
+            self.avg_call_seconds = 0.9 * self.avg_call_seconds + 0.1 * (time.perf_counter() - started)
+            self._release()
+
+    def _dequeue(self, priority: LLMPriority, user_id: str, future: asyncio.Future):
+        waiters = self._queues[priority].get(user_id)
+        if waiters and future in waiters:
+            waiters.remove(future)
+            if not waiters:
+                del self._queues[priority][user_id]
+            self._depth[priority] -= 1
+            self._decrement_user(user_id)
+
+    def _decrement_user(self, user_id: str):
+        remaining = self._queued_by_user.get(user_id, 0) - 1
+        if remaining > 0:
+            self._queued_by_user[user_id] = remaining
+        else:
+            self._queued_by_user.pop(user_id, None)
+
+    def _release(self):
+        """Hand the slot to the next waiter, or free it"""
+        for priority in LLMPriority:
+            users = self._queues[priority]
+            while users:
+                user_id, waiters = next(iter(users.items()))
+                future = waiters.popleft()
+                if waiters:
+                    users.move_to_end(user_id)
+                else:
+                    del users[user_id]
+                self._depth[priority] -= 1
+                self._decrement_user(user_id)
+                # Skip waiters cancelled since they queued
+                if not future.done():
+                    future.set_result(None)
+                    return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict:
+        """Snapshot of scheduler state for monitoring"""
+        avg_wait = self.total_wait_seconds / self.total_calls if self.total_calls else 0.0
+        return {
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "queue_depth_by_priority": {p.name.lower(): self._depth[p] for p in LLMPriority},
+            "queued_users": len(self._queued_by_user),
+            "peak_queue_depth": self.peak_waiting,
+            "total_calls": self.total_calls,
+            "rejected_by_priority": {p.name.lower(): self.rejected[p] for p in LLMPriority},
+            "avg_wait_ms": round(avg_wait * 1000, 2),
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 2)
+        }
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one shared upstream task"""
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, factory: Callable[[], Awaitable]):
+        """Await the in-flight call for key, starting it with factory() if there is none"""
+        future = self._in_flight.get(key)
+        if future is None:
+            self.leaders += 1
+            future = asyncio.ensure_future(factory())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # Shield so one disconnecting caller does not cancel the call for everyone else
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict:
+        """Snapshot of coalescing counters for monitoring"""
+        return {
+            "in_flight_keys": len(self._in_flight),
+            "upstream_calls": self.leaders,
+            "coalesced_calls": self.coalesced
+        }
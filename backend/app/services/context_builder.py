@@ -0,0 +1,58 @@
+import math
+from typing import Dict, List, Optional
+
+# Rough Gemini tokenizer ratio for English text; good enough for budgeting
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = " ...[truncated]"
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate for a piece of text"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text down to roughly max_tokens, marking the cut"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    keep_chars = max(0, max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER))
+    return text[:keep_chars].rstrip() + TRUNCATION_MARKER
+
+
+def build_context(
+    system_prompt: str,
+    user_message: str,
+    history: Optional[List[Dict]] = None,
+    token_budget: int = 3000,
+    max_message_tokens: int = 1000
+) -> List[Dict[str, str]]:
+    """Pack system prompt, conversation history and the new user message into a token budget.
+
+    The system prompt and the (possibly truncated) user message are always sent.
+    History is added newest first until the budget runs out, with every message
+    capped at max_message_tokens, and returned in chronological order.
+    """
+    user_content = truncate_to_tokens(user_message, max_message_tokens)
+    remaining = token_budget - estimate_tokens(system_prompt) - estimate_tokens(user_content)
+
+    packed = []
+    for msg in reversed(history or []):
+        if remaining <= 0:
+            break
+        role = msg.get("role")
+        content = msg.get("content")
+        if role not in ("user", "assistant") or not content:
+            continue
+        content = truncate_to_tokens(str(content), min(max_message_tokens, remaining))
+        cost = estimate_tokens(content)
+        if cost > remaining:
+            break
+        packed.append({"role": role, "content": content})
+        remaining -= cost
+
+    messages = [{"role": "system", "content": system_prompt}]
+    messages.extend(reversed(packed))
+    messages.append({"role": "user", "content": user_content})
+    return messages
@@ -0,0 +1,70 @@
+import asyncio
+from typing import Any, Set
+
+from ..config import settings
+from ..database import get_collection
+from .ai_service import ai_service
+from .concurrency import llm_caller, LLMPriority
+
+# Tasks currently being summarized in this worker, and references to the running jobs
+_in_progress: Set[str] = set()
+_background_jobs: Set[asyncio.Task] = set()
+
+
+def needs_summary(task: dict) -> bool:
+    """Whether a task conversation has grown past the summarization threshold"""
+    return len(task.get("conversation_history") or []) > settings.task_summary_trigger_turns
+
+
+def schedule_task_summary(task_id: Any):
+    """Fold older turns of a task conversation into its summary in the background"""
+    key = str(task_id)
+    if key in _in_progress:
+        return
+    _in_progress.add(key)
+    job = asyncio.get_running_loop().create_task(summarize_task_conversation(task_id))
+    _background_jobs.add(job)
+    job.add_done_callback(_background_jobs.discard)
+    job.add_done_callback(lambda _: _in_progress.discard(key))
+
+
+async def summarize_task_conversation(task_id: Any):
+    """Replace all but the most recent turns with an updated conversation_summary"""
+    tasks_collection = get_collection("tasks")
+    if tasks_collection is None:
+        return
+
+    task = tasks_collection.find_one({"_id": task_id})
+    if not task or not needs_summary(task):
+        return
+
+    history = task.get("conversation_history", [])
+    fold_count = len(history) - settings.task_summary_keep_turns
+    try:
+        # Background work: queue behind interactive calls
+        with llm_caller(LLMPriority.BULK, task.get("student_id")):
+            summary = await ai_service.summarize_conversation(
+                task_title=task.get("title", "task"),
+                turns=history[:fold_count],
+                previous_summary=task.get("conversation_summary")
+            )
+    except Exception as e:
+        print(f"Conversation summary error: {e}")
+        return
+
+    if not summary:
+        return
+
+    # Turns are only ever appended, so pull exactly the folded turns to keep anything
+    # added while the summary was generated. The filter on summarized_turns skips the
+    # write if another worker folded this conversation first.
+    result = tasks_collection.update_one(
+        {"_id": task_id, "summarized_turns": task.get("summarized_turns")},
+        {
+            "$pull": {"conversation_history": {"$in": history[:fold_count]}},
+            "$set": {"conversation_summary": summary},
+            "$inc": {"summarized_turns": fold_count}
+        }
+    )
+    if not result.matched_count:
+        print(f"Conversation summary for task {task_id} skipped: already folded elsewhere")
@@ -0,0 +1,110 @@
+import json
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from ..data.fallback_intents import FALLBACK_INTENTS
+
+
+class IntentMatcher:
+    """Multi-keyword intent classifier built on an Aho-Corasick automaton.
+
+    All keywords of all intents are compiled into one trie with failure links, so
+    a message is scanned once regardless of how many intents or keywords exist.
+    Keywords match whole words, or word prefixes when written with a trailing *.
+    Each matched keyword adds its weight (default 1) to its intent; the highest
+    score wins and ties go to the intent listed first.
+    """
+
+    def __init__(self, intents: List[Dict]):
+        self.intents = intents
+        self.default = next((i for i in intents if not i.get("keywords")), None)
+        # Node arrays: goto transitions, failure link, outputs (intent index, length, prefix, weight)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, int, bool, float]]] = [[]]
+
+        for index, intent in enumerate(intents):
+            weight = float(intent.get("weight", 1.0))
+            for keyword in intent.get("keywords", []):
+                prefix = keyword.endswith("*")
+                word = keyword.rstrip("*").lower()
+                if word:
+                    self._add(word, (index, len(word), prefix, weight))
+        self._build_failure_links()
+
+    def _add(self, word: str, output: Tuple[int, int, bool, float]):
+        node = 0
+        for char in word:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(output)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                link = self._goto[fallback].get(char, 0)
+                self._fail[child] = link if link != child else 0
+                # Inherit matches that end at the same position via the suffix link
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def scores(self, text: str) -> Dict[int, float]:
+        """Keyword score per intent index for text, in one pass"""
+        text = text.lower()
+        scores: Dict[int, float] = {}
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for index, length, prefix, weight in self._out[node]:
+                start = end - length + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if not prefix and end + 1 < len(text) and text[end + 1].isalnum():
+                    continue
+                scores[index] = scores.get(index, 0.0) + weight
+        return scores
+
+    def match(self, text: str) -> Optional[Dict]:
+        """Best-scoring intent for text, or the default intent"""
+        scores = self.scores(text)
+        if not scores:
+            return self.default
+        best = min(scores, key=lambda index: (-scores[index], index))
+        return self.intents[best]
+
+
+def load_intents(path: Optional[str] = None) -> List[Dict]:
+    """Built-in intents, extended or overridden by a JSON list of intents at path"""
+    intents = [dict(intent) for intent in FALLBACK_INTENTS]
+    if not path:
+        return intents
+    try:
+        with open(path, encoding="utf-8") as f:
+            extra = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not load fallback intents from {path}: {e}")
+        return intents
+
+    by_name = {intent["intent"]: i for i, intent in enumerate(intents)}
+    for intent in extra:
+        if intent.get("intent") in by_name:
+            intents[by_name[intent["intent"]]].update(intent)
+        else:
+            # New intents rank ahead of the built-in default
+            default_at = next((i for i, it in enumerate(intents) if not it.get("keywords")), len(intents))
+            intents.insert(default_at, intent)
+            by_name = {it["intent"]: i for i, it in enumerate(intents)}
+    return intents
@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import json
+import secrets
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..database import get_collection
+from .concurrency import llm_caller, LLMPriority, LLMQueueFullError
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+JobHandler = Callable[[Dict[str, Any], str], Awaitable[Dict]]
+
+
+def job_fingerprint(job_type: str, student_id: str, params: Dict[str, Any]) -> str:
+    """Default idempotency key: the same request from the same student maps to one job"""
+    payload = json.dumps({"type": job_type, "student": student_id, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class JobQueue:
+    """In-process worker pool for long AI generations, persisted in the jobs collection.
+
+    submit() stores the job and returns at once; workers claim queued jobs by
+    flipping their status, run the registered handler at bulk LLM priority and
+    store the result. Submitting the same request again (or with the same
+    Idempotency-Key) within job_idempotency_window_seconds returns the existing
+    job unless it failed. Failed attempts are retried with backoff up to
+    job_max_attempts, and jobs left queued or stuck running by a restart are
+    picked up again on start().
+    """
+
+    def __init__(self, workers: int = 2, max_attempts: int = 3):
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def register(self, job_type: str, handler: JobHandler):
+        """Handle jobs of job_type with handler(params, student_id) -> result dict"""
+        self._handlers[job_type] = handler
+
+    def start(self):
+        """Start the workers and re-queue unfinished jobs from earlier runs"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._recover()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(
+        self,
+        job_type: str,
+        student_id: str,
+        params: Dict[str, Any],
+        idempotency_key: Optional[str] = None
+    ) -> Tuple[Dict, bool]:
+        """Create a job (or find the matching one), returning (job, created)"""
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        jobs_collection = get_collection("jobs")
+        key = idempotency_key or job_fingerprint(job_type, student_id, params)
+
+        now_ts = time.time()
+        for job in jobs_collection.find({"student_id": student_id, "idempotency_key": key}):
+            if job["status"] != JOB_FAILED and job.get("dedupe_until", 0) > now_ts:
+                return job, False
+
+        now = datetime.now(timezone.utc)
+        job = {
+            "_id": secrets.token_hex(12),
+            "type": job_type,
+            "student_id": student_id,
+            "params": params,
+            "idempotency_key": key,
+            "status": JOB_QUEUED,
+            "attempts": 0,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "dedupe_until": now_ts + settings.job_idempotency_window_seconds,
+            "started_ts": None,
+            "finished_at": None
+        }
+        jobs_collection.insert_one(job)
+        self._enqueue(job["_id"])
+        return job, True
+
+    def get(self, job_id: str, student_id: str) -> Optional[Dict]:
+        jobs_collection = get_collection("jobs")
+        return jobs_collection.find_one({"_id": job_id, "student_id": student_id})
+
+    def _enqueue(self, job_id: str, delay: float = 0.0):
+        if self._queue is None:
+            # Workers not started (e.g. scripts); the job is picked up by the next start()
+            return
+        if delay:
+            asyncio.get_running_loop().call_later(delay, self._queue.put_nowait, job_id)
+        else:
+            self._queue.put_nowait(job_id)
+
+    def _recover(self):
+        jobs_collection = get_collection("jobs")
+        if jobs_collection is None:
+            return
+        stale_before = time.time() - settings.job_stale_seconds
+        recovered = 0
+        for job in jobs_collection.find({"status": {"$in": [JOB_QUEUED, JOB_RUNNING]}}):
+            if job["status"] == JOB_RUNNING:
+                if (job.get("started_ts") or 0) > stale_before:
+                    continue  # probably still running in another worker process
+                jobs_collection.update_one({"_id": job["_id"]}, {"$set": {"status": JOB_QUEUED}})
+            self._enqueue(job["_id"])
+            recovered += 1
+        if recovered:
+            print(f"[INFO] Re-queued {recovered} unfinished AI jobs")
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                print(f"Job worker error ({job_id}): {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        jobs_collection = get_collection("jobs")
+        job = jobs_collection.find_one({"_id": job_id})
+        if not job or job["status"] != JOB_QUEUED:
+            return
+        attempts = job.get("attempts", 0) + 1
+        # Claim the job; a duplicate enqueue or another process sees it running
+        claimed = jobs_collection.update_one(
+            {"_id": job_id, "status": JOB_QUEUED},
+            {"$set": {"status": JOB_RUNNING, "attempts": attempts, "started_ts": time.time()}}
+        )
+        if not claimed or not claimed.modified_count:
+            return
+
+        handler = self._handlers.get(job["type"])
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for job type {job['type']}")
+            with llm_caller(LLMPriority.BULK, job["student_id"]):
+                result = await handler(job["params"], job["student_id"])
+        except Exception as e:
+            retry_in = e.retry_after if isinstance(e, LLMQueueFullError) else 2 ** attempts
+            if attempts < self.max_attempts:
+                print(f"Job {job_id} attempt {attempts} failed ({e}); retrying in {retry_in}s")
+                jobs_collection.update_one({"_id": job_id}, {"$set": {"status": JOB_QUEUED, "error": str(e)}})
+                self._enqueue(job_id, delay=retry_in)
+            else:
+                jobs_collection.update_one({"_id": job_id}, {"$set": {
+                    "status": JOB_FAILED,
+                    "error": str(e),
+                    "finished_at": datetime.now(timezone.utc)
+                }})
+            return
+
+        jobs_collection.update_one({"_id": job_id}, {"$set": {
+            "status": JOB_SUCCEEDED,
+            "result": result,
+            "error": None,
+            "finished_at": datetime.now(timezone.utc)
+        }})
+
+    def stats(self) -> Dict:
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue else 0
+        }
+
+
+job_queue = JobQueue(workers=settings.job_workers, max_attempts=settings.job_max_attempts)
@@ -0,0 +1,247 @@
+import asyncio
+import atexit
+import gzip
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional
+
+from .ai_cache import prompt_fingerprint
+from .context_builder import estimate_tokens
+from .llm_providers import LLMProvider
+
+
+class ReplayedLLMError(Exception):
+    """Upstream failure recorded in a cassette, raised again on replay"""
+
+
+class CassetteMissError(Exception):
+    """Replay requested a call that the cassette does not contain"""
+
+
+def cassette_key(messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+                 response_schema: Optional[type] = None, stream: bool = False) -> str:
+    """Recording key; leaves out the model so a cassette replays under any provider"""
+    return prompt_fingerprint(
+        messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        schema=response_schema.__name__ if response_schema else None,
+        stream=stream
+    )
+
+
+class CassetteWriter:
+    """Appends one gzip-compressed JSON line per LLM call"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+        self.records = 0
+
+    def write(self, record: Dict):
+        line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                # Each session appends a new gzip member; readers see one stream
+                self._file = gzip.open(self.path, "at", encoding="utf-8")
+                atexit.register(self.close)
+            self._file.write(line)
+            self._file.flush()
+            self.records += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def load_cassette(path: str) -> List[Dict]:
+    """Read all records of a cassette file in recording order"""
+    records = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    return records
+
+
+class RecordingProvider(LLMProvider):
+    """Wraps a provider and records every call (prompt, response, latency, token estimates)"""
+
+    def __init__(self, inner: LLMProvider, writer: CassetteWriter):
+        self.inner = inner
+        self.writer = writer
+        self.name = f"{inner.name}+record"
+        self.model = inner.model
+
+    def _record(self, messages, temperature, max_tokens, response_schema, stream, started,
+                response=None, chunks=None, first_token_ms=None, error=None):
+        self.writer.write({
+            "key": cassette_key(messages, temperature, max_tokens, response_schema, stream),
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "schema": response_schema.__name__ if response_schema else None,
+            "stream": stream,
+            "response": response,
+            "chunks": chunks,
+            "error": error,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "first_token_ms": first_token_ms,
+            "prompt_tokens": sum(estimate_tokens(m.get("content", "")) for m in messages),
+            "response_tokens": estimate_tokens(response or "".join(chunks or []))
+        })
+
+    async def generate(self, messages, temperature, max_tokens, response_schema=None):
+        started = time.perf_counter()
+        try:
+            response = await self.inner.generate(messages, temperature, max_tokens, response_schema)
+        except Exception as e:
+            self._record(messages, temperature, max_tokens, response_schema, False, started, error=repr(e))
+            raise
+        self._record(messages, temperature, max_tokens, response_schema, False, started, response=response)
+        return response
+
+    async def stream(self, messages, temperature, max_tokens):
+        started = time.perf_counter()
+        chunks: List[str] = []
+        first_token_ms = None
+        error = None
+        try:
+            async for text in self.inner.stream(messages, temperature, max_tokens):
+                if text and first_token_ms is None:
+                    first_token_ms = round((time.perf_counter() - started) * 1000, 1)
+                if text:
+                    chunks.append(text)
+                yield text
+        except Exception as e:
+            error = repr(e)
+            raise
+        finally:
+            self._record(messages, temperature, max_tokens, None, True, started,
+                         chunks=chunks, first_token_ms=first_token_ms, error=error)
+
+
+class ReplayProvider(LLMProvider):
+    """Answers from a recorded cassette without calling the upstream model.
+
+    Calls are matched on the prompt key; identical prompts get their recordings in
+    order, and a prompt that is not in the cassette raises CassetteMissError. With
+    substitute=True it takes the next unused recording instead (for example to replay
+    a whole trace after changing the context builder); every substitution is logged
+    and counted so stats() shows how far the prompts have drifted from the recording.
+    With simulate_latency the recorded latencies are reproduced as well.
+    """
+
+    name = "replay"
+
+    def __init__(self, records: List[Dict], simulate_latency: bool = False, substitute: bool = False):
+        self.model = records[0].get("model", "replay") if records else "replay"
+        self.simulate_latency = simulate_latency
+        self.substitute = substitute
+        self._by_key: Dict[str, Deque[int]] = defaultdict(deque)
+        for i, record in enumerate(records):
+            self._by_key[record["key"]].append(i)
+        self._records = records
+        self._used = [False] * len(records)
+        self._next_unused = 0
+
+        self.exact_hits = 0
+        self.substitutions = 0
+        self.misses = 0
+        self.recorded_prompt_tokens = 0
+        self.replayed_prompt_tokens = 0
+        self.latencies_ms: List[float] = []
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "ReplayProvider":
+        return cls(load_cassette(path), **kwargs)
+
+    def _take(self, key: str, messages: List[Dict[str, str]]) -> Dict:
+        queue = self._by_key.get(key)
+        while queue and self._used[queue[0]]:
+            queue.popleft()
+        if queue:
+            index = queue.popleft()
+            self.exact_hits += 1
+        else:
+            if not self.substitute:
+                self.misses += 1
+                raise CassetteMissError(f"No recording for prompt {key[:12]}")
+            while self._next_unused < len(self._records) and self._used[self._next_unused]:
+                self._next_unused += 1
+            if self._next_unused >= len(self._records):
+                self.misses += 1
+                raise CassetteMissError("Cassette exhausted")
+            index = self._next_unused
+            self.substitutions += 1
+            print(f"Warning: no recording for prompt {key[:12]}; replaying recording #{index} instead")
+        self._used[index] = True
+
+        record = self._records[index]
+        self.recorded_prompt_tokens += record.get("prompt_tokens") or 0
+        self.replayed_prompt_tokens += sum(estimate_tokens(m.get("content", "")) for m in messages)
+        self.latencies_ms.append(record.get("latency_ms") or 0.0)
+        return record
+
+    async def generate(self, messages, temperature, max_tokens, response_schema=None):
+        record = self._take(cassette_key(messages, temperature, max_tokens, response_schema), messages)
+        if self.simulate_latency:
+            await asyncio.sleep((record.get("latency_ms") or 0) / 1000)
+        if record.get("error"):
+            raise ReplayedLLMError(record["error"])
+        if record.get("stream"):
+            return "".join(record.get("chunks") or []) or None
+        return record.get("response")
+
+    async def stream(self, messages, temperature, max_tokens):
+        record = self._take(cassette_key(messages, temperature, max_tokens, stream=True), messages)
+        chunks = record.get("chunks")
+        if chunks is None:
+            chunks = [record["response"]] if record.get("response") else []
+        if self.simulate_latency:
+            first_token_ms = record.get("first_token_ms") or record.get("latency_ms") or 0
+            await asyncio.sleep(first_token_ms / 1000)
+        if record.get("error") and not chunks:
+            raise ReplayedLLMError(record["error"])
+        gap = 0.0
+        if self.simulate_latency and len(chunks) > 1:
+            remaining_ms = (record.get("latency_ms") or 0) - (record.get("first_token_ms") or 0)
+            gap = max(0.0, remaining_ms) / 1000 / (len(chunks) - 1)
+        for i, text in enumerate(chunks):
+            if i and gap:
+                await asyncio.sleep(gap)
+            yield text
+        if record.get("error"):
+            raise ReplayedLLMError(record["error"])
+
+    def stats(self) -> Dict:
+        """Replay coverage, prompt token comparison and recorded latency percentiles"""
+        latencies = sorted(self.latencies_ms)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            "recordings": len(self._records),
+            "exact_hits": self.exact_hits,
+            "substitutions": self.substitutions,
+            "misses": self.misses,
+            "recorded_prompt_tokens": self.recorded_prompt_tokens,
+            "replayed_prompt_tokens": self.replayed_prompt_tokens,
+            "prompt_tokens_saved": self.recorded_prompt_tokens - self.replayed_prompt_tokens,
+            "latency_p50_ms": percentile(0.50),
+            "latency_p95_ms": percentile(0.95),
+            "latency_p99_ms": percentile(0.99)
+        }
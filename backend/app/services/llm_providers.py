@@ -0,0 +1,260 @@
+import asyncio
+import json
+import math
+import random
+import typing
+from typing import AsyncIterator, Dict, List, Optional
+
+from pydantic import BaseModel
+
+try:
+    from google import genai
+    from google.genai import types
+    GEMINI_AVAILABLE = True
+except ImportError:
+    GEMINI_AVAILABLE = False
+from ..config import settings
+
+
+class LLMProvider:
+    """Interface AIService uses to talk to a language model.
+
+    Messages are OpenAI-style dicts (system/user/assistant). generate() returns the
+    response text or None when the provider blocked the response (safety filters);
+    transport or quota problems are raised as exceptions.
+    """
+
+    name = "base"
+    model: Optional[str] = None
+
+    async def generate(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        response_schema: Optional[type] = None
+    ) -> Optional[str]:
+        raise NotImplementedError
+
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> AsyncIterator[Optional[str]]:
+        """Yield text chunks as they are generated (None for chunks without text)"""
+        raise NotImplementedError
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini via the async google-genai client"""
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model: str = "gemini-2.0-flash"):
+        self.client = genai.Client(api_key=api_key)
+        self.model = model
+
+    def _convert_messages(self, messages: List[Dict[str, str]]) -> tuple:
+        """Convert OpenAI-style messages to Gemini format"""
+        gemini_messages = []
+        system_instruction = None
+
+        for msg in messages:
+            role = msg.get("role")
+            content = msg.get("content", "")
+
+            if role == "system":
+                system_instruction = content
+            elif role == "user":
+                gemini_messages.append(types.Content(
+                    role="user",
+                    parts=[types.Part.from_text(text=content)]
+                ))
+            elif role == "assistant":
+                gemini_messages.append(types.Content(
+                    role="model",
+                    parts=[types.Part.from_text(text=content)]
+                ))
+
+        return system_instruction, gemini_messages
+
+    def _config(self, system_instruction, temperature, max_tokens, response_schema=None):
+        config = types.GenerateContentConfig(
+            system_instruction=system_instruction,
+            temperature=temperature,
+            max_output_tokens=max_tokens
+        )
+        if response_schema:
+            config.response_mime_type = "application/json"
+            config.response_schema = response_schema
+        return config
+
+    async def generate(self, messages, temperature, max_tokens, response_schema=None):
+        system_instruction, gemini_messages = self._convert_messages(messages)
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=gemini_messages,
+            config=self._config(system_instruction, temperature, max_tokens, response_schema)
+        )
+        # Safety filters leave the response without text
+        try:
+            return response.text
+        except (ValueError, AttributeError):
+            return None
+
+    async def stream(self, messages, temperature, max_tokens):
+        system_instruction, gemini_messages = self._convert_messages(messages)
+        stream = await self.client.aio.models.generate_content_stream(
+            model=self.model,
+            contents=gemini_messages,
+            config=self._config(system_instruction, temperature, max_tokens)
+        )
+        async for chunk in stream:
+            try:
+                yield chunk.text
+            except (ValueError, AttributeError):
+                yield None
+
+
+class FakeLLMError(Exception):
+    """Simulated upstream failure raised by FakeLLMProvider"""
+
+
+class FakeLLMProvider(LLMProvider):
+    """Local stand-in for Gemini for load tests and CI without network access.
+
+    Latency is log-normal around latency_ms (spread set by latency_sigma); streams
+    emit word chunks at tokens_per_second after the first-token latency. A fraction
+    of calls fail (failure_rate) or come back safety-blocked (block_rate). Requests
+    with a response schema get schema-valid JSON.
+    """
+
+    name = "fake"
+
+    WORDS = (
+        "focus", "practice", "concepts", "projects", "consistency", "fundamentals", "build",
+        "review", "problems", "daily", "skills", "learn", "apply", "feedback", "progress"
+    )
+
+    def __init__(
+        self,
+        latency_ms: float = 800.0,
+        latency_sigma: float = 0.5,
+        tokens_per_second: float = 60.0,
+        failure_rate: float = 0.0,
+        block_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.model = "fake-gemini"
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.failure_rate = failure_rate
+        self.block_rate = block_rate
+        self._random = random.Random(seed)
+
+    def _latency(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        return self._random.lognormvariate(math.log(self.latency_ms / 1000), self.latency_sigma)
+
+    def _check_failure(self):
+        if self._random.random() < self.failure_rate:
+            raise FakeLLMError("Simulated upstream failure")
+
+    def _blocked(self) -> bool:
+        return self._random.random() < self.block_rate
+
+    def _reply(self, messages: List[Dict[str, str]], max_tokens: int, response_schema=None) -> str:
+        if response_schema:
+            return json.dumps(_sample_instance(response_schema))
+        user_msg = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+        word_count = self._random.randint(max(1, max_tokens // 4), max(1, max_tokens // 2))
+        filler = " ".join(self._random.choice(self.WORDS) for _ in range(word_count))
+        return f"(fake response to: {user_msg[:60]}) {filler}"
+
+    async def generate(self, messages, temperature, max_tokens, response_schema=None):
+        await asyncio.sleep(self._latency())
+        self._check_failure()
+        if self._blocked():
+            return None
+        return self._reply(messages, max_tokens, response_schema)
+
+    async def stream(self, messages, temperature, max_tokens):
+        await asyncio.sleep(self._latency())  # time to first token
+        self._check_failure()
+        if self._blocked():
+            yield None
+            return
+        words = self._reply(messages, max_tokens).split(" ")
+        for i in range(0, len(words), 4):
+            chunk = words[i:i + 4]
+            yield (" " if i else "") + " ".join(chunk)
+            await asyncio.sleep(len(chunk) / self.tokens_per_second)
+
+
+def _sample_instance(model: type) -> Dict:
+    """Minimal schema-valid payload for a pydantic model"""
+    return {name: _sample_value(field.annotation, name) for name, field in model.model_fields.items()}
+
+
+def _sample_value(annotation, name: str):
+    origin = typing.get_origin(annotation)
+    if origin in (list, List):
+        (item_type,) = typing.get_args(annotation) or (str,)
+        return [_sample_value(item_type, name)]
+    if origin is typing.Union:
+        return _sample_value(next(a for a in typing.get_args(annotation) if a is not type(None)), name)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _sample_instance(annotation)
+    if annotation is int:
+        return 75
+    if annotation is float:
+        return 0.75
+    if annotation is bool:
+        return True
+    return f"sample {name.replace('_', ' ')}"
+
+
+def create_provider() -> Optional[LLMProvider]:
+    """Build the provider selected by LLM_PROVIDER, or None if it cannot be used
+
+    LLM_CASSETTE_MODE=record wraps it to log every call; replay answers from the
+    cassette instead of any live provider.
+    """
+    from .llm_cassette import CassetteWriter, RecordingProvider, ReplayProvider
+
+    mode = (settings.llm_cassette_mode or "off").lower()
+    if mode == "replay":
+        try:
+            return ReplayProvider.from_file(
+                settings.llm_cassette_path,
+                simulate_latency=settings.llm_cassette_simulate_latency,
+                substitute=settings.llm_cassette_substitute
+            )
+        except FileNotFoundError:
+            print(f"Warning: LLM cassette {settings.llm_cassette_path} not found; replay disabled")
+            return None
+    provider = _create_live_provider()
+    if mode == "record" and provider:
+        return RecordingProvider(provider, CassetteWriter(settings.llm_cassette_path))
+    return provider
+
+
+def _create_live_provider() -> Optional[LLMProvider]:
+    provider = (settings.llm_provider or "gemini").lower()
+    if provider == "fake":
+        return FakeLLMProvider(
+            latency_ms=settings.fake_llm_latency_ms,
+            latency_sigma=settings.fake_llm_latency_sigma,
+            tokens_per_second=settings.fake_llm_tokens_per_second,
+            failure_rate=settings.fake_llm_failure_rate,
+            block_rate=settings.fake_llm_block_rate,
+            seed=settings.fake_llm_seed
+        )
+    if provider != "gemini":
+        print(f"Warning: unknown LLM_PROVIDER '{settings.llm_provider}', using gemini")
+    if GEMINI_AVAILABLE and settings.gemini_api_key:
+        return GeminiProvider(api_key=settings.gemini_api_key)
+    return None
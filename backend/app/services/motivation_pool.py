@@ -0,0 +1,99 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+
+# Served until the first refill (and for good when no LLM provider is configured)
+DEFAULT_MESSAGES = [
+    "Success is not final, failure is not fatal: it is the courage to continue that counts.",
+    "The difference between who you are and who you want to be is what you do.",
+    "Engineering is not about having all the answers - it's about having the persistence to find them.",
+    "Believe in yourself and your abilities. Every challenge you face is making you stronger and more capable. Keep pushing forward!"
+]
+
+
+class MotivationPool:
+    """Fixed-size ring buffer of motivational messages, refilled in the background.
+
+    next() rotates through the buffer in O(1) without touching the LLM; a
+    refresher task periodically generates a batch of new messages that overwrite
+    the oldest entries.
+    """
+
+    def __init__(
+        self,
+        generate_batch: Callable[[int], Awaitable[Optional[List[str]]]],
+        capacity: int = 32,
+        batch_size: int = 8,
+        refresh_seconds: float = 900.0
+    ):
+        self.generate_batch = generate_batch
+        self.capacity = max(1, capacity)
+        self.batch_size = max(1, batch_size)
+        self.refresh_seconds = refresh_seconds
+        self._buffer: List[str] = list(DEFAULT_MESSAGES[:self.capacity])
+        self._write = len(self._buffer) % self.capacity
+        self._read = 0
+        self._task: Optional[asyncio.Task] = None
+        self.refills = 0
+        self.generated = 0
+
+    def next(self) -> str:
+        message = self._buffer[self._read % len(self._buffer)]
+        self._read = (self._read + 1) % len(self._buffer)
+        return message
+
+    def add(self, messages: List[str]) -> int:
+        """Insert new messages over the oldest ones, skipping duplicates"""
+        added = 0
+        for message in messages:
+            message = message.strip()
+            if not message or message in self._buffer:
+                continue
+            if len(self._buffer) < self.capacity:
+                self._buffer.append(message)
+            else:
+                self._buffer[self._write] = message
+            self._write = (self._write + 1) % self.capacity
+            added += 1
+        self.generated += added
+        return added
+
+    async def refill(self) -> int:
+        """Generate one batch of messages into the pool"""
+        messages = await self.generate_batch(self.batch_size)
+        if not messages:
+            return 0
+        self.refills += 1
+        return self.add(messages)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresher())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _refresher(self):
+        while True:
+            try:
+                # Fill the whole ring at startup, then replace one batch per interval
+                while self.generated < self.capacity:
+                    if not await self.refill():
+                        break
+                await asyncio.sleep(self.refresh_seconds)
+                await self.refill()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Motivation pool refresh error: {e}")
+                await asyncio.sleep(self.refresh_seconds)
+
+    def stats(self):
+        return {
+            "size": len(self._buffer),
+            "capacity": self.capacity,
+            "generated": self.generated,
+            "refills": self.refills
+        }
@@ -1,14 +1,27 @@
+import hashlib
 import io
 from pypdf import PdfReader
+from ..config import settings
+from ..services.ai_cache import TTLLRUCache
+
+# Extracted text keyed by a hash of the PDF bytes, so re-uploads skip parsing
+pdf_text_cache = TTLLRUCache(settings.ats_cache_max_entries)
 
 def extract_text_from_pdf(file_content: bytes) -> str:
     """Extract text from PDF file content"""
+    key = hashlib.sha256(file_content).hexdigest()
+    cached = pdf_text_cache.get(key)
+    if cached is not None:
+        return cached
     try:
         reader = PdfReader(io.BytesIO(file_content))
         text = ""
         for page in reader.pages:
             text += page.extract_text() + "\n"
-        return text.strip()
+        text = text.strip()
     except Exception as e:
         print(f"Error extracting text from PDF: {e}")
         return ""
+    if text:
+        pdf_text_cache.set(key, text, settings.ats_cache_ttl_seconds)
+    return text
@@ -0,0 +1,17 @@
+import json
+from typing import Any, Optional
+
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"  # Stop reverse proxies from buffering the stream
+}
+
+
+def format_sse(data: Any, event: Optional[str] = None) -> str:
+    """Format a payload as a Server-Sent Events message"""
+    message = ""
+    if event:
+        message += f"event: {event}\n"
+    message += f"data: {json.dumps(data)}\n\n"
+    return message
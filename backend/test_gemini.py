@@ -1,9 +1,22 @@
 """
 Test script for Gemini API integration
 Run this to verify your Gemini API key is working correctly
+
+    python test_gemini.py                      # live calls
+    python test_gemini.py --record [CASSETTE]  # live calls, saved to a cassette
+    python test_gemini.py --replay [CASSETTE]  # offline, answered from the cassette
 """
 import asyncio
+import os
 import sys
+
+DEFAULT_CASSETTE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cassettes", "test_gemini.jsonl.gz")
+
+# Settings are read when ai_service is imported, so pick the cassette mode first
+if len(sys.argv) > 1 and sys.argv[1] in ("--record", "--replay"):
+    os.environ["LLM_CASSETTE_MODE"] = sys.argv[1][2:]
+    os.environ["LLM_CASSETTE_PATH"] = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_CASSETTE
+
 from app.services.ai_service import ai_service
 
 async def test_gemini():
@@ -66,6 +79,8 @@ async def test_gemini():
     print("Test 4: Motivational Message Generation")
     print("-" * 60)
     try:
+        added = await ai_service.motivation_pool.refill()
+        print(f"Pool refill added {added} messages")
         motivation = await ai_service.generate_motivation()
         print(f"Motivation: {motivation}")
         print()
@@ -193,6 +208,11 @@ async def test_gemini():
     print("1. Your GEMINI_API_KEY is set in the .env file")
     print("2. LLM_PROVIDER=gemini in the .env file")
     print("3. You've restarted the backend server")
+    
+    replay_stats = ai_service.get_runtime_stats().get("replay")
+    if replay_stats:
+        print()
+        print(f"Replay: {replay_stats}")
 
 if __name__ == "__main__":
     # Run the async test
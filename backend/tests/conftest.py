@@ -31,3 +31,15 @@ def auth_token(api_base_url):
 @pytest.fixture(scope="session")
 def auth_headers(auth_token):
     return {"Authorization": f"Bearer {auth_token}"}
+
+@pytest.fixture(scope="session")
+def admin_headers(api_base_url):
+    """Authorization headers for the seeded admin account"""
+    payload = {
+        "email": "admin@aiconsular.com",
+        "password": "admin123"
+    }
+    response = requests.post(f"{api_base_url}/api/auth/login", json=payload)
+    if response.status_code != 200:
+        pytest.skip("Admin account not available")
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,281 @@
+"""
+SQL generated by the PostgreSQL adapter
+
+These check the statement text and the order of its parameters without a
+database. Set POSTGRES_TEST_URI to also run the statements against a server.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import pytest
+
+from app.postgres_adapter import PostgresClient, PostgresCollection
+from app.postgres_aggregate import compile_pipeline, run_pipeline
+
+POSTGRES_TEST_URI = os.getenv("POSTGRES_TEST_URI")
+needs_postgres = pytest.mark.skipif(not POSTGRES_TEST_URI, reason="POSTGRES_TEST_URI not set")
+
+LOGIN_TIME = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+# Task performance pipeline from /api/stats/admin
+ADMIN_TASK_PIPELINE = [
+    {"$group": {
+        "_id": "$subject",
+        "completed": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
+        "total": {"$sum": 1}
+    }}
+]
+
+
+@pytest.fixture
+def tasks():
+    return PostgresCollection(None, "tasks")
+
+
+class RecordingCursor:
+    """Cursor stand-in that records statements and reports one changed row"""
+
+    def __init__(self, statements):
+        self.statements = statements
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.statements.append((sql, list(params or [])))
+
+    def fetchall(self):
+        return [(True,)]
+
+    def fetchone(self):
+        return (True,)
+
+
+class RecordingDatabase:
+    def __init__(self):
+        self.statements = []
+        self.ttl_fields = {}
+        self.ttl_purged_at = {}
+        self.pool = self
+
+    @contextmanager
+    def connection(self):
+        class Connection:
+            cursor = lambda _, **kwargs: RecordingCursor(self.statements)
+        yield Connection()
+
+
+@pytest.fixture
+def pg_collection():
+    client = PostgresClient(POSTGRES_TEST_URI)
+    collection = client["test"]["sql_generation_test"]
+    collection.delete_many({})
+    yield collection
+    with client.pool.connection() as conn, conn.cursor() as cur:
+        cur.execute("DROP TABLE IF EXISTS sql_generation_test")
+    client.close()
+
+
+def test_compile_admin_task_pipeline(tasks):
+    sql, params = compile_pipeline(tasks, ADMIN_TASK_PIPELINE)
+    subject = "COALESCE(doc->'subject', '\"Unknown\"'::jsonb)"
+    assert sql == (
+        f"SELECT jsonb_build_object('_id', {subject}, "
+        "'completed', COALESCE(SUM(CASE WHEN COALESCE(doc->'status', 'null'::jsonb) = %s::jsonb THEN 1 ELSE 0 END), 0), "
+        "'total', COUNT(*) * 1) AS doc "
+        f"FROM tasks GROUP BY {subject}"
+    )
+    assert params == ['"completed"']
+
+
+def test_compile_pipeline_puts_accumulator_params_before_match_params(tasks):
+    sql, params = compile_pipeline(tasks, [
+        {"$match": {"student_id": "s1"}},
+        {"$group": {"_id": "$type", "done": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}}}},
+        {"$sort": {"done": -1}},
+        {"$limit": 3}
+    ])
+    assert sql.index("= %s::jsonb") < sql.index("doc->>'student_id' = %s")
+    assert params == ['"completed"', "s1"]
+    assert sql.endswith(" grouped ORDER BY doc->'done' DESC NULLS LAST LIMIT 3")
+
+
+def test_compile_sort_on_group_key_reads_it_from_doc(tasks):
+    sql, params = compile_pipeline(tasks, [
+        {"$group": {"_id": "$subject", "n": {"$sum": 1}}},
+        {"$sort": {"_id": 1}}
+    ])
+    # The grouped subquery only has a doc column
+    assert sql.endswith(" grouped ORDER BY doc->'_id' ASC NULLS FIRST")
+    assert params == []
+
+
+def test_compile_null_group_key_returns_no_row_for_no_documents(tasks):
+    pipeline = [{"$group": {"_id": None, "total": {"$sum": 1}}}]
+    sql, params = compile_pipeline(tasks, pipeline)
+    # An aggregate without GROUP BY yields one row even over an empty table
+    assert sql.endswith("FROM tasks HAVING COUNT(*) > 0")
+    assert params == []
+    assert run_pipeline([], pipeline) == []
+
+
+def test_compile_pipeline_rejects_unsupported_stages(tasks):
+    assert compile_pipeline(tasks, [{"$unwind": "$tags"}]) is None
+    assert compile_pipeline(tasks, [{"$group": {"_id": "$subject", "first": {"$first": "$title"}}}]) is None
+
+
+@needs_postgres
+def test_aggregate_matches_python_evaluation(pg_collection):
+    null_group = [{"$group": {"_id": None, "total": {"$sum": 1}}}]
+    assert pg_collection.aggregate(null_group) == []
+
+    docs = [
+        {"_id": "t1", "subject": "Math", "status": "completed"},
+        {"_id": "t2", "subject": "Math", "status": "pending"},
+        {"_id": "t3", "subject": "Physics", "status": "completed"},
+        {"_id": "t4", "status": "pending"}
+    ]
+    pg_collection.insert_many([dict(doc) for doc in docs])
+    by_id = lambda rows: sorted(rows, key=lambda row: row["_id"])
+    assert by_id(pg_collection.aggregate(ADMIN_TASK_PIPELINE)) == by_id(run_pipeline(docs, ADMIN_TASK_PIPELINE))
+    sorted_groups = ADMIN_TASK_PIPELINE + [{"$sort": {"_id": 1}}]
+    assert pg_collection.aggregate(sorted_groups) == run_pipeline(docs, sorted_groups)
+    assert pg_collection.aggregate(null_group) == [{"_id": None, "total": 4}]
+
+
+# Current value of an array field, or [] when it is missing or not an array
+ARRAY_OR_EMPTY = "COALESCE(CASE WHEN jsonb_typeof(doc #> %s::text[]) = 'array' THEN doc #> %s::text[] END, '[]'::jsonb)"
+
+
+def test_compile_login_update(tasks):
+    # auth.py login: count the login and stamp the session fields
+    expr, params = tasks._compile_update({
+        "$inc": {"login_count": 1},
+        "$set": {"last_login": LOGIN_TIME, "status": "active", "updated_at": LOGIN_TIME}
+    })
+    increment = (
+        "jsonb_set(doc, %s::text[], to_jsonb(COALESCE(CASE WHEN jsonb_typeof(doc #> %s::text[]) = 'number' "
+        "THEN (doc #>> %s::text[])::numeric END, 0) + %s::numeric))"
+    )
+    assert expr == f"jsonb_set(jsonb_set(jsonb_set({increment}, %s::text[], %s::jsonb), %s::text[], %s::jsonb), %s::text[], %s::jsonb)"
+    assert params == [
+        ["login_count"], ["login_count"], ["login_count"], 1,
+        ["last_login"], '"2026-01-02T03:04:05+00:00"',
+        ["status"], '"active"',
+        ["updated_at"], '"2026-01-02T03:04:05+00:00"'
+    ]
+
+
+def test_compile_assistance_turn_update(tasks):
+    # tasks.py _append_assistance_turn: push both turns and mark the task in progress
+    turns = [{"role": "user", "content": "q"}, {"role": "assistant", "content": "a"}]
+    expr, params = tasks._compile_update({
+        "$push": {"conversation_history": {"$each": turns}},
+        "$set": {"ai_assistance_used": True, "status": "in-progress"}
+    })
+    assert expr == (
+        f"jsonb_set(jsonb_set(jsonb_set(doc, %s::text[], {ARRAY_OR_EMPTY} || %s::jsonb), "
+        "%s::text[], %s::jsonb), %s::text[], %s::jsonb)"
+    )
+    history = ["conversation_history"]
+    assert params == [
+        history, history, history,
+        '[{"role": "user", "content": "q"}, {"role": "assistant", "content": "a"}]',
+        ["ai_assistance_used"], "true",
+        ["status"], '"in-progress"'
+    ]
+
+
+def test_compile_dotted_set_creates_parent(tasks):
+    expr, params = tasks._compile_update({"$set": {"profile.branch": "CSE"}})
+    assert expr == (
+        "jsonb_set(jsonb_set(doc, %s::text[], COALESCE(CASE WHEN jsonb_typeof(doc #> %s::text[]) = 'object' "
+        "THEN doc #> %s::text[] END, '{}'::jsonb)), %s::text[], %s::jsonb)"
+    )
+    assert params == [["profile"], ["profile"], ["profile"], ["profile", "branch"], '"CSE"']
+
+
+@pytest.mark.parametrize("update", [
+    {"$addToSet": {"enrolled_courses": "c1"}},
+    {"$addToSet": {"tags": {"$each": ["a", "b", "a"]}}, "$unset": {"draft": ""}},
+    {"$pull": {"conversation_history": {"$in": [{"role": "user"}]}}, "$inc": {"summarized_turns": 10}}
+])
+def test_compile_update_placeholders_match_params(tasks, update):
+    expr, params = tasks._compile_update(update)
+    assert expr.count("%s") == len(params)
+
+
+def test_compile_update_rejects_unknown_operators(tasks):
+    with pytest.raises(ValueError):
+        tasks._compile_update({"$rename": {"a": "b"}})
+    with pytest.raises(ValueError):
+        tasks._compile_update({"$set": {"_id": "x"}})
+
+
+def test_update_statement_orders_params():
+    db = RecordingDatabase()
+    db.ttl_fields["cache"] = ("expires", 0)
+    cache = PostgresCollection(db, "cache")
+    result = cache.update_one({"key": "k1"}, {"$set": {"value": 1, "expires": LOGIN_TIME}})
+
+    sql, params = db.statements[-1]
+    assert (result.matched_count, result.modified_count) == (1, 1)
+    assert sql.startswith(
+        "WITH target AS (SELECT id, doc AS old FROM cache WHERE doc->>'key' = %s LIMIT 1 FOR UPDATE) "
+        "UPDATE cache SET doc = (SELECT CASE WHEN n.v = cache.doc THEN n.v ELSE n.v || %s::jsonb END "
+        "FROM (SELECT jsonb_set(jsonb_set(doc, %s::text[], %s::jsonb), %s::text[], %s::jsonb) AS v) n), "
+        "expires_at = %s FROM target"
+    )
+    assert sql.count("%s") == len(params)
+    # WHERE, then the updated_at stamp, the field updates and finally expires_at
+    assert params[0] == "k1"
+    assert params[1].startswith('{"updated_at": ')
+    assert params[2:6] == [["value"], "1", ["expires"], '"2026-01-02T03:04:05+00:00"']
+    assert params[6] == LOGIN_TIME
+
+
+def test_replace_by_id_upserts_in_one_statement():
+    # SharedResponseCache.set: replace_one({"_id": key}, entry, upsert=True)
+    db = RecordingDatabase()
+    db.ttl_fields["ai_cache"] = ("expires_at", 0)
+    db.ttl_purged_at["ai_cache"] = time.monotonic()  # no purge due
+    cache = PostgresCollection(db, "ai_cache")
+    result = cache.replace_one({"_id": "k1"}, {"response": "r", "expires_at": LOGIN_TIME}, upsert=True)
+
+    assert len(db.statements) == 1
+    sql, params = db.statements[0]
+    assert sql == (
+        "INSERT INTO ai_cache (id, doc, expires_at) VALUES (%s, %s, %s) "
+        "ON CONFLICT (id) DO UPDATE SET doc = EXCLUDED.doc, expires_at = EXCLUDED.expires_at RETURNING xmax = 0"
+    )
+    assert params[0] == "k1" and params[2] == LOGIN_TIME
+    assert (result.modified_count, result.upserted_id) == (0, "k1")
+
+
+@needs_postgres
+def test_updates_apply_on_postgres(pg_collection):
+    pg_collection.insert_one({"_id": "u1", "login_count": 2, "enrolled_courses": ["c1"]})
+    result = pg_collection.update_one({"_id": "u1"}, {
+        "$inc": {"login_count": 1},
+        "$set": {"last_login": LOGIN_TIME, "status": "active", "updated_at": LOGIN_TIME}
+    })
+    assert (result.matched_count, result.modified_count) == (1, 1)
+    user = pg_collection.find_one({"_id": "u1"})
+    assert user["login_count"] == 3 and user["status"] == "active"
+
+    # Enrolling twice in a course changes nothing the second time
+    assert pg_collection.update_one({"_id": "u1"}, {"$addToSet": {"enrolled_courses": "c1"}}).modified_count == 0
+
+    turns = [{"role": "user", "content": str(i)} for i in range(4)]
+    pg_collection.update_one({"_id": "u1"}, {"$push": {"conversation_history": {"$each": turns}}})
+    # Summary fold: conditional on summarized_turns, which is missing the first time
+    fold = {"$pull": {"conversation_history": {"$in": turns[:2]}}, "$inc": {"summarized_turns": 2}}
+    assert pg_collection.update_one({"_id": "u1", "summarized_turns": None}, fold).matched_count == 1
+    assert pg_collection.update_one({"_id": "u1", "summarized_turns": None}, fold).matched_count == 0
+    user = pg_collection.find_one({"_id": "u1"})
+    assert user["conversation_history"] == turns[2:] and user["summarized_turns"] == 2